@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from api.endpoints import (
     setup,
+    stream,
     task
 )
 from utils.limit_generator import rate_limited_shared
@@ -14,6 +15,13 @@ api_router.include_router(
     dependencies=[Depends(rate_limited_shared)]
 )
 
+# Long-lived event streams are not counted against the request rate limit
+api_router.include_router(
+    stream.router,
+    prefix="/task",
+    tags=["Streams"]
+)
+
 api_router.include_router(
     setup.router,
     prefix="",
@@ -1,8 +1,14 @@
+import os
+import time
 import logging
-from fastapi import APIRouter
+from typing import Annotated
+from fastapi import APIRouter, Header
 from schema.dto.response.index import SetupResponse, DataSetup
 from schema.dto.request.index import PromptRequest
 from service.leads_service import init, check_session
+from service.selector_registry import selector_registry
+from service.result_cache import criteria_hash, find_cached_job
+from service.job_queue import get_active_job
 from utils.uuid import uuid7
 import asyncio
 import globals
@@ -10,6 +16,8 @@ import globals
 
 # ------------- configuration
 state_lock = asyncio.Lock()
+# A session that has not enqueued its job yet absorbs identical submissions for this long
+IDEMPOTENCY_WINDOW_SECONDS = int(os.getenv("IDEMPOTENCY_WINDOW_SECONDS", "600"))
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -42,32 +50,90 @@ async def initial_setup():
     }
 
 
-@router.post("/prompt", response_model=SetupResponse)
-async def setup_prompt(request: PromptRequest):
-    data = init()
-    session = check_session()
-    session_id = str(uuid7())
-    async with state_lock:
+def _register_session(session_id: str, session: list, payload: dict, **extra):
+    # Keep the state of a session another client is already driving
+    if session_id not in globals.global_state:
         globals.global_state[session_id] = {
             "platforms": session,
             "next_task": None,
             "state": None,
-            "payload": {
-                "jobTitle": request.jobTitle,
-                "numberOfLeads": request.numberOfLeads,
-                "seniorityLevel": request.seniorityLevel,
-                "industry": request.industry,
-                "yearsOfExperience": request.yearsOfExperience,
-                "goodToHave": request.goodToHave,
-            }
+            "payload": payload,
         }
+    globals.global_state[session_id].update(extra)
+
+
+def _pending_session(idempotency_key: str):
+    """A recent session with the same key that has not enqueued its job yet."""
+    for session_id, data in globals.global_state.items():
+        if (data.get("idempotencyKey") == idempotency_key and not data.get("jobId")
+                and time.time() - data.get("createdAt", 0) < IDEMPOTENCY_WINDOW_SECONDS):
+            return session_id
+    return None
+
+
+@router.post("/prompt", response_model=SetupResponse)
+async def setup_prompt(
+    request: PromptRequest,
+    idempotency_key: Annotated[str | None, Header(alias="Idempotency-Key")] = None,
+):
+    """
+    Starts a session for the search criteria. An identical search (same
+    canonicalized criteria) that finished within the cache TTL answers
+    straight from its stored leads, and identical submissions that arrive
+    while one is still in flight share its session and job. `Idempotency-Key`
+    replaces the criteria hash as the dedupe key.
+    """
+    data = init()
+    session = check_session()
+    payload = {
+        "jobTitle": request.jobTitle,
+        "numberOfLeads": request.numberOfLeads,
+        "seniorityLevel": request.seniorityLevel,
+        "industry": request.industry,
+        "yearsOfExperience": request.yearsOfExperience,
+        "goodToHave": request.goodToHave,
+        "functions": request.functions,
+        "companyHeadcount": request.companyHeadcount,
+    }
+    criteria = criteria_hash(payload)
+    key = idempotency_key or criteria
+    cached_job = await find_cached_job(criteria)
+    active_job = None if cached_job else await get_active_job(key)
+    async with state_lock:
+        if cached_job:
+            # A session of its own that reads the cached job's leads; the job's session stays untouched
+            session_id = str(uuid7())
+            _register_session(session_id, session, payload, cachedJobId=cached_job.id, cachedSessionId=cached_job.session_id)
+            state = {"sessionId": session_id, "jobId": cached_job.id, "resultsSessionId": cached_job.session_id, "cached": True}
+            logger.info(f"/prompt: served from cached job {cached_job.id} (criteria {criteria[:12]})")
+        elif active_job:
+            session_id = active_job.session_id
+            _register_session(session_id, session, active_job.payload, jobId=active_job.id)
+            state = {"sessionId": session_id, "jobId": active_job.id, "deduplicated": True}
+            logger.info(f"/prompt: joined active job {active_job.id}")
+        elif _pending_session(key):
+            session_id = _pending_session(key)
+            state = {"sessionId": session_id, "deduplicated": True}
+            logger.info(f"/prompt: joined pending session {session_id}")
+        else:
+            session_id = str(uuid7())
+            _register_session(session_id, session, payload, criteriaHash=criteria, idempotencyKey=key, createdAt=time.time())
+            state = {"sessionId": session_id}
     return {
         "success": True,
         "data": DataSetup(
             platforms = session,
             result = data,
-            state = {
-                "sessionId": session_id
-            }
+            state = state
         )
     }
+
+
+@router.get("/selectors/stats")
+async def selector_stats():
+    # Workers flush their own counters, pick them up before reporting
+    selector_registry.reload()
+    return {
+        "success": True,
+        "data": selector_registry.stats()
+    }
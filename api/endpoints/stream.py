@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from fastapi import APIRouter, Header, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Annotated
+from service.job_events import follow_events, read_events
+from utils.websocket import ConnectionManager, DROP
+
+
+# ------------- configuration
+router = APIRouter()
+manager = ConnectionManager(queue_size=256, slow_policy=os.getenv("WS_SLOW_CONSUMER_POLICY", DROP))
+logger = logging.getLogger(__name__)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(levelname)-8s:\t %(name)-20s %(message)s"
+)
+
+KEEPALIVE_SECONDS = 15
+# -------------- end configuration
+
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.get("/{sessionId}/stream")
+async def stream_job_events(
+    sessionId: str,
+    cursor: int = 0,
+    lastEventId: Annotated[int | None, Header(alias="Last-Event-ID")] = None,
+):
+    """
+    Server-sent events for a session's scrape job: progress events and each
+    enriched lead as the pipeline produces it. Reconnect with `cursor` (or the
+    browser's Last-Event-ID) set to the last seq received to resume.
+    """
+    start = lastEventId if lastEventId is not None else cursor
+
+    async def events():
+        last_sent = time.monotonic()
+        async for event in follow_events(sessionId, cursor=start):
+            if event is not None:
+                last_sent = time.monotonic()
+                yield format_sse(event)
+            elif time.monotonic() - last_sent > KEEPALIVE_SECONDS:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+class SessionFeed:
+    """
+    Tails one session's event log and publishes each event to the session's
+    topic, so any number of WebSocket clients share one reader. Runs while
+    the topic has subscribers.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.topic = f"session:{session_id}"
+        self.cursor = 0
+        self.lock = asyncio.Lock()  # keeps a joining client's backlog and the live events in order
+        self.task = None
+
+    async def start(self):
+        self.cursor = max((event["seq"] for event in await asyncio.to_thread(read_events, self.session_id)), default=0)
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        async for event in follow_events(self.session_id, cursor=self.cursor, stop_after_terminal=False):
+            if event is None:
+                continue
+            async with self.lock:
+                self.cursor = event["seq"]
+                await manager.broadcast(json.dumps(event, ensure_ascii=False, default=str), topic=self.topic)
+
+    async def join(self, websocket: WebSocket, cursor: int):
+        """Sends the events after `cursor` that were written before the client joined, then subscribes it."""
+        async with self.lock:
+            for event in await asyncio.to_thread(read_events, self.session_id, cursor):
+                if event["seq"] <= self.cursor:
+                    await manager.send_personal_message(json.dumps(event, ensure_ascii=False, default=str), websocket)
+            manager.subscribe(websocket, self.topic)
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+
+
+feeds: dict[str, SessionFeed] = {}
+feeds_lock = asyncio.Lock()
+
+
+@router.websocket("/{sessionId}/ws")
+async def websocket_job_events(websocket: WebSocket, sessionId: str, cursor: int = 0):
+    """Same events as /stream over a WebSocket, one JSON message per event. Resume with `cursor`."""
+    await manager.connect(websocket)
+    async with feeds_lock:
+        feed = feeds.get(sessionId)
+        if feed is None:
+            feed = feeds[sessionId] = SessionFeed(sessionId)
+            await feed.start()
+    try:
+        await feed.join(websocket, cursor)
+        while True:
+            # Nothing is expected from the client; this only notices it going away
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        logger.info(f"WebSocket client for session {sessionId} disconnected")
+    finally:
+        manager.disconnect(websocket)
+        async with feeds_lock:
+            if manager.subscriber_count(feed.topic) == 0 and feeds.get(sessionId) is feed:
+                feed.stop()
+                del feeds[sessionId]
+
+
+@router.get("/stream/metrics")
+async def websocket_metrics():
+    return {
+        "success": True,
+        "data": {**manager.metrics(), "feeds": len(feeds)}
+    }
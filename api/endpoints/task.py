@@ -1,14 +1,17 @@
 import logging
-from fastapi import APIRouter, Header, Depends, HTTPException
-from utils.constant import ConstantsTask
+from fastapi import APIRouter, Header, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from utils.constant import ConstantsTask, ConstantsJob
 from schema.dto.request.index import SearchLeadRequest, CommonHeaders
 from schema.dto.response.index import TaskResponse, DataTask
 import asyncio
 import globals
 from typing import Annotated
 from service.leads_service import start_search_leads_task
-from service.login_linkedin import login_to_linkedin  
-from service.login_linkedin import active_sessions
+from service.session_vault import session_vault, LINKEDIN_ACCOUNT
+from service.job_queue import get_latest_job
+from service.results_service import get_results_page, RESULTS_PAGE_SIZE, RESULTS_MAX_PAGE_SIZE
+from service.export_service import export_leads, check_export, export_filename, export_media_type, ExportError
 
 
 
@@ -54,6 +57,62 @@ async def initial_task(
     }
 
 
+@router.get("/status")
+async def job_status(
+    header: CommonHeaders = Depends(common_headers_dependency)
+):
+    session_id = header.sessionId
+    job = await get_latest_job(session_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No job found for session")
+    return {
+        "success": True,
+        "data": {
+            "jobId": job.id,
+            "status": job.status,
+            "attempts": job.attempts,
+            "error": job.error
+        }
+    }
+
+
+@router.get("/{sessionId}/results")
+async def job_results(
+    sessionId: str,
+    cursor: str | None = None,
+    limit: int = Query(RESULTS_PAGE_SIZE, ge=1, le=RESULTS_MAX_PAGE_SIZE),
+    company: str | None = None,
+    location: str | None = None,
+    minScore: int | None = Query(None, ge=0, le=100),
+):
+    try:
+        page = await get_results_page(sessionId, cursor=cursor, limit=limit, company=company, location=location, min_score=minScore)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "success": True,
+        "data": page
+    }
+
+
+@router.get("/{sessionId}/export")
+async def job_export(
+    sessionId: str,
+    format: str = "csv",
+    compression: str = "none",
+):
+    """Streams all of a session's leads as csv, ndjson, xlsx or parquet, optionally gzip or zstd compressed."""
+    try:
+        check_export(format, compression)
+    except ExportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        export_leads(sessionId, format, compression),
+        media_type=export_media_type(format, compression),
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(sessionId, format, compression)}"'},
+    )
+
+
 # @router.post("/login-linkedin")
 # async def linkedin_login_endpoint(  # Renamed to avoid conflict with imported function
 #     header: CommonHeaders = Depends(common_headers_dependency)
@@ -111,15 +170,27 @@ async def create_lead_filters(
             raise Exception("Session not found")
         if data["next_task"] != current_task:
             raise Exception("Invalid task order")
-        
-        try:
-            login_success = await login_to_linkedin(session_id)
-            if not login_success:
-                raise HTTPException(status_code=500, detail="Failed to log in to LinkedIn")
-        except Exception as e:
-            logger.error(f"LinkedIn login error for session {session_id}: {e}")
-            raise HTTPException(status_code=500, detail=f"LinkedIn login failed: {e}")
-        
+
+        if data.get("cachedJobId") or data.get("jobId"):
+            # Answered from the result cache or already enqueued by an identical submission, no browser needed
+            return {
+                "success": True,
+                "data": DataTask(
+                    results = [],
+                    state = {
+                        "sessionId": session_id
+                    },
+                    next = {
+                        "task": next_task,
+                        "payload": data["payload"]
+                    }
+                )
+            }
+
+        # The workers own the browsers and log them in; the API only checks the vault
+        if not await asyncio.to_thread(session_vault.has_session, LINKEDIN_ACCOUNT):
+            logger.warning(f"No stored LinkedIn session for session {session_id}, the worker will have to log in")
+
         return {
             "success": True,
             "data": DataTask(
@@ -150,28 +221,44 @@ async def search_leads(
         if data["next_task"] != current_task:
             raise HTTPException(status_code=400, detail="Invalid task order")
 
-        # Log before retrieval attempt
-        logger.info(f"/search-leads: Attempting to retrieve driver for session_id: {session_id} from global_state...")
-
-        # **Get the driver from global_state**
-        driver = globals.global_state[session_id].get("selenium_driver")
-        if not driver:
-            logger.warning(f"/search-leads: No active Selenium session found for session_id: {session_id} in global_state. Login required.") # Log warning if not found
-            logger.warning(f"/search-leads: globals.global_state contents at retrieval failure: {globals.global_state}") # Log global_state at failure
-            raise HTTPException(status_code=500, detail="No active Selenium session found. Login required.")
+        if data.get("cachedJobId"):
+            # Same criteria finished within the cache TTL: hand back its leads instead of scraping again
+            # The leads are stored under the session of the job that scraped them
+            page = await get_results_page(data["cachedSessionId"])
+            logger.info(f"/search-leads: Served session_id: {session_id} from cached job {data['cachedJobId']}")
+            return {
+                "success": True,
+                "data": DataTask(
+                    results = page["results"],
+                    state = {
+                        "sessionId": session_id,
+                        "jobId": data["cachedJobId"],
+                        "resultsSessionId": data["cachedSessionId"],
+                        "cached": True,
+                        "nextCursor": page["nextCursor"]
+                    },
+                    next = {
+                        "task": next_task,
+                        "payload": data["payload"]
+                    }
+                )
+            }
 
-        logger.info(f"/search-leads: Driver successfully retrieved for session_id: {session_id} in /search-leads endpoint.") # Log success
-        logger.info(f"/search-leads: globals.global_state contents AFTER successful retrieval: {globals.global_state}") # Log global_state after retrieval
-        logger.info(f"--- /search-leads endpoint END ---") # Added end log
+        # Scraping runs in the worker processes (worker.py), which own their browsers
+        job = await get_latest_job(session_id) if data.get("jobId") else None
+        if job is None or job.status == ConstantsJob.FAILED:
+            job = await start_search_leads_task(session_id, data)
+        data["jobId"] = job.id
+        logger.info(f"/search-leads: Enqueued job {job.id} for session_id: {session_id}")
 
-
-        start_search_leads_task(session_id, data, driver=driver) # **Pass driver to task function**
         return {
             "success": True,
             "data": DataTask(
                 results = [],
                 state = {
-                    "sessionId": session_id
+                    # An identical submission's job may belong to another session
+                    "sessionId": job.session_id,
+                    "jobId": job.id
                 },
                 next = {
                     "task": next_task,
@@ -81,8 +81,6 @@ async def create_async_session() -> AsyncGenerator[AsyncSession, None]:
             except Exception as e:
                 await session.rollback()
                 raise e
-            finally:
-                await session.close()
 
 
 connection_string = f"postgresql://{username}:{password}@{host}:{port}/{path}"
@@ -1,11 +1,7 @@
-from groq import Groq
-import csv
+from service.llm_gateway import llm_gateway
 import json
 import re
-import os
-import time
 from fuzzywuzzy import process
-from dotenv import load_dotenv
 import logging
 
 
@@ -62,7 +58,7 @@ def clean_groq_output(raw_text):
 
 def parse_candidate_criteria(criteria_text):
     """
-    Send candidate criteria to the LLM via Groq and return structured search parameters.
+    Send candidate criteria to the LLM gateway (Groq first, then its fallbacks) and return structured search parameters.
     Expected output JSON includes keys: 'function', 'seniority level', 'industry', 'years of experience'.
     """
     prompt = (
@@ -88,13 +84,8 @@ def parse_candidate_criteria(criteria_text):
         "}\n"
     )
 
-    load_dotenv()
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    response = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model="llama-3.3-70b-versatile"
-    )
-    raw_output = response.choices[0].message.content
+    response = llm_gateway.complete([{"role": "user", "content": prompt}])
+    raw_output = response.content
     structured_data = clean_groq_output(raw_output)
     return structured_data
 
@@ -125,6 +116,7 @@ It is good if the leads also have:
 2. Interest in waste management and circular economy
 3. Knowledge of sustainability practices
 """
-parsed_data = parse_candidate_criteria(criteria_text)
+if __name__ == "__main__":
+    parsed_data = parse_candidate_criteria(criteria_text)
 
-print(json.dumps(parsed_data, indent=2))
\ No newline at end of file
+    print(json.dumps(parsed_data, indent=2))
\ No newline at end of file
@@ -4,7 +4,9 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from schema.entity.base_model import Base
 from alembic import context
-from schema.entity.model_registry import ModelRegistry  # Import your new model
+from schema.entity.scrape_job import ScrapeJob  # Import your new model
+from schema.entity.lead import Lead
+from schema.entity.company import Company
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
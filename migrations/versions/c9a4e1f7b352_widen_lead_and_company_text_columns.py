@@ -0,0 +1,39 @@
+"""Widen lead and company text columns
+
+Revision ID: c9a4e1f7b352
+Revises: e7c3a9d21f54
+Create Date: 2026-10-18 19:12:40.518207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9a4e1f7b352'
+down_revision: Union[str, None] = 'e7c3a9d21f54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ('lead', 'name'),
+    ('lead', 'title'),
+    ('lead', 'location'),
+    ('lead', 'company_name'),
+    ('company', 'name'),
+    ('company', 'headquarters'),
+]
+
+
+def upgrade() -> None:
+    for table, column in COLUMNS:
+        op.alter_column(table, column, existing_type=sa.String(length=255), type_=sa.Text(), existing_nullable=True)
+
+
+def downgrade() -> None:
+    for table, column in COLUMNS:
+        op.alter_column(
+            table, column, existing_type=sa.Text(), type_=sa.String(length=255), existing_nullable=True,
+            postgresql_using=f'left({column}, 255)',
+        )
@@ -1,7 +1,6 @@
 import csv
 import json
 import re
-import os
 import time
 import random
 from datetime import datetime
@@ -14,8 +13,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException, ElementClickInterceptedException
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
-from groq import Groq
-from dotenv import load_dotenv
+from service.llm_gateway import llm_gateway
 
 # -------------------------------
 # Utility Functions
@@ -239,7 +237,7 @@ def clean_groq_output(raw_text):
 
 def parse_candidate_criteria(criteria_text):
     """
-    Send candidate criteria to the LLM via Groq and return structured search parameters.
+    Send candidate criteria to the LLM gateway (Groq first, then its fallbacks) and return structured search parameters.
     Expected output JSON includes a "function" key.
     """
     prompt = (
@@ -254,13 +252,8 @@ def parse_candidate_criteria(criteria_text):
         "}\n"
     )
 
-    load_dotenv()
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    response = client.chat.completions.create(
-        messages=[{"role": "user", "content": prompt}],
-        model="llama-3.3-70b-versatile"
-    )
-    raw_output = response.choices[0].message.content
+    response = llm_gateway.complete([{"role": "user", "content": prompt}])
+    raw_output = response.content
     structured_data = clean_groq_output(raw_output)
     return structured_data
 
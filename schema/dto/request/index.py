@@ -18,6 +18,20 @@ class CommonHeaders(BaseModel):
     sessionId: str | None = None
 
 
+def check_allowed_values(v: Optional[List[str]], allowed_values, field: str) -> Optional[List[str]]:
+    """Maps each value case-insensitively onto `allowed_values`, rejecting the unknown ones."""
+    if v is None:
+        return v
+    allowed_lower_map = {value.lower(): value for value in allowed_values}
+    invalid_values = [value for value in v if value.lower().strip() not in allowed_lower_map]
+    if invalid_values:
+        raise ValueError(
+            f"Invalid value `{', '.join(invalid_values)}` on `{field}` field - "
+            f"Allowed values: {', '.join(allowed_values)}"
+        )
+    return [allowed_lower_map[value.lower().strip()] for value in v]
+
+
 class PromptRequest(BaseSchema):
     jobTitle: str
     numberOfLeads: int
@@ -25,6 +39,8 @@ class PromptRequest(BaseSchema):
     industry: str
     yearsOfExperience: int
     goodToHave: str
+    functions: Optional[List[str]] = None
+    companyHeadcount: Optional[List[str]] = None
 
     @field_validator('jobTitle')
     def check_job_title(cls, v: str) -> str:
@@ -97,6 +113,14 @@ class PromptRequest(BaseSchema):
             )
         
         return allowed_lower_map[lower_v]
+
+    @field_validator('functions')
+    def check_functions(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return check_allowed_values(v, StaticValue().FUNCTIONS.values(), 'functions')
+
+    @field_validator('companyHeadcount')
+    def check_company_headcount(cls, v: Optional[List[str]]) -> Optional[List[str]]:
+        return check_allowed_values(v, StaticValue().COMPANY_HEADCOUNT.values(), 'companyHeadcount')
     
 
 
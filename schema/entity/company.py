@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, Text, TIMESTAMP
+from schema.entity.base_model import BaseModel
+
+
+class Company(BaseModel):
+    __tablename__ = "company"
+
+    company_id = Column(String(32), nullable=False, unique=True)
+    name = Column(Text, nullable=True)
+    link = Column(Text, nullable=True)
+    overview = Column(Text, nullable=True)
+    headquarters = Column(Text, nullable=True)
+    website = Column(Text, nullable=True)
+    scraped_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"Company(id={self.id}, company_id={self.company_id}, name={self.name})"
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, String, Integer, Text, UniqueConstraint, Index
+from schema.entity.base_model import BaseModel
+
+
+class Lead(BaseModel):
+    __tablename__ = "lead"
+
+    session_id = Column(String(36), nullable=False)
+    member_id = Column(String(100), nullable=False)
+    position = Column(Integer, nullable=False)
+    name = Column(Text, nullable=True)
+    title = Column(Text, nullable=True)
+    profile_link = Column(Text, nullable=True)
+    location = Column(Text, nullable=True)
+    about = Column(Text, nullable=True)
+    linkedin_url = Column(Text, nullable=True)
+    phones = Column(Text, nullable=True)
+    emails = Column(Text, nullable=True)
+    websites = Column(Text, nullable=True)
+    socials = Column(Text, nullable=True)
+    addresses = Column(Text, nullable=True)
+    company_id = Column(String(32), nullable=True, index=True)
+    company_name = Column(Text, nullable=True)
+    company_link = Column(Text, nullable=True)
+    relevance_score = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("session_id", "member_id", name="uq_lead_session_id_member_id"),
+        # Keyset pagination of a session's results in search result order
+        Index("ix_lead_session_id_position", "session_id", "position", "id"),
+    )
+
+    def __repr__(self):
+        return f"Lead(id={self.id}, session_id={self.session_id}, member_id={self.member_id}, name={self.name})"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Integer, Text, TIMESTAMP, JSON, Index, text
+from schema.entity.base_model import BaseModel
+from utils.constant import ConstantsJob
+
+
+class ScrapeJob(BaseModel):
+    __tablename__ = "scrape_job"
+
+    session_id = Column(String(36), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default=ConstantsJob.QUEUED)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    lease_owner = Column(String(100), nullable=True)
+    lease_expires_at = Column(TIMESTAMP(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+    criteria_hash = Column(String(64), nullable=True)
+    idempotency_key = Column(String(255), nullable=True)
+
+    __table_args__ = (
+        Index("ix_scrape_job_status_created_at", "status", "created_at"),
+        Index("ix_scrape_job_criteria_hash_status", "criteria_hash", "status"),
+        # At most one queued/running job per key, so identical concurrent submissions share it
+        Index(
+            "uq_scrape_job_active_idempotency_key", "idempotency_key", unique=True,
+            postgresql_where=text(f"status IN ('{ConstantsJob.QUEUED}', '{ConstantsJob.RUNNING}')"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"ScrapeJob(id={self.id}, session_id={self.session_id}, status={self.status}, attempts={self.attempts})"
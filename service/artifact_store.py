@@ -0,0 +1,91 @@
+import io
+import os
+import logging
+import tempfile
+from contextlib import contextmanager
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", "artifacts")
+
+# Artifact names used by the scrape pipeline
+SEARCH_CARDS = "search_cards.csv"
+LEADS_PRO = "leads_pro.csv"
+LEADS_PRO_COMPANY_INFO = "leads_pro_company_info.csv"
+
+
+class ArtifactStore:
+    """
+    Files produced by one scrape job, under `artifacts/<job_id>/` (the job id
+    is the session id). Writes go to a temp file that is renamed over the
+    target, so readers never see a half-written file, and are serialised by
+    an exclusive lock on the job directory, so concurrent jobs on one host
+    never share or clobber each other's outputs.
+    """
+
+    def __init__(self, job_id: str, root: str = ARTIFACT_DIR):
+        self.job_id = job_id
+        self.directory = os.path.join(root, job_id)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path(name))
+
+    @contextmanager
+    def lock(self):
+        """Exclusive lock for this job's directory, across threads and processes."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, ".lock"), "a+b") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def write_bytes(self, name: str, data: bytes):
+        with self.lock():
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.", suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "wb") as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(tmp_path, self.path(name))
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def write_text(self, name: str, text: str):
+        self.write_bytes(name, text.encode("utf-8"))
+
+    def write_csv(self, name: str, df: pd.DataFrame):
+        buffer = io.StringIO()
+        df.to_csv(buffer, index=False)
+        self.write_text(name, buffer.getvalue())
+        logging.info(f"Saved {len(df)} rows to {self.path(name)}")
+
+    def append_line(self, name: str, line: str):
+        """Appends one line to a log-style artifact (e.g. an event log)."""
+        with self.lock():
+            with open(self.path(name), "a", encoding="utf-8") as file:
+                file.write(line.rstrip("\n") + "\n")
+                file.flush()
+                os.fsync(file.fileno())
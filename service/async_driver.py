@@ -0,0 +1,53 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from selenium import webdriver
+
+
+class AsyncDriver:
+    """
+    Async facade over a blocking Selenium driver. The browser is owned by one
+    dedicated worker thread, every command runs there and coroutines await the
+    result, so Selenium calls never block the event loop.
+
+        title = await adriver.execute_script("return document.title")
+        url = await adriver.current_url
+        await adriver.submit(main_scrape_leads, session_id=..., driver=adriver.driver, ...)
+    """
+
+    def __init__(self, driver: webdriver.Chrome, name: str = "driver"):
+        self.driver = driver
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        self._owner = self._executor.submit(threading.get_ident).result()
+
+    async def submit(self, fn, *args, **kwargs):
+        """Run `fn(*args, **kwargs)` on the driver thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    def call(self, fn, *args, **kwargs):
+        """Blocking `submit` for threads without an event loop (pool upkeep, background refresh)."""
+        if threading.get_ident() == self._owner:
+            return fn(*args, **kwargs)
+        return self._executor.submit(fn, *args, **kwargs).result()
+
+    async def get_property(self, name: str):
+        """Read a driver property (e.g. `current_url`) on the driver thread."""
+        return await self.submit(getattr, self.driver, name)
+
+    def __getattr__(self, name: str):
+        if isinstance(getattr(type(self.driver), name, None), property):
+            # Properties like current_url or page_source send a WebDriver command when read
+            return self.get_property(name)
+        attr = getattr(self.driver, name)
+        if not callable(attr):
+            return attr
+
+        async def command(*args, **kwargs):
+            return await self.submit(attr, *args, **kwargs)
+
+        return command
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,242 @@
+import os
+import time
+import tempfile
+import threading
+import logging
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from dotenv import load_dotenv
+from service.async_driver import AsyncDriver
+from service.network_capture import NetworkCapture, network_capture_enabled
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+POOL_MIN_SIZE = int(os.getenv("BROWSER_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("BROWSER_POOL_MAX_SIZE", "4"))
+POOL_BASE_DEBUG_PORT = int(os.getenv("BROWSER_POOL_BASE_DEBUG_PORT", "9222"))
+POOL_PROFILE_ROOT = os.getenv("BROWSER_POOL_PROFILE_ROOT", os.path.join(tempfile.gettempdir(), "linkedin-profiles"))
+POOL_HEADLESS = os.getenv("BROWSER_POOL_HEADLESS", "false").lower() == "true"
+LEASE_TIMEOUT = 300
+
+
+def build_chrome_options(debug_port: int, profile_dir: str, headless: bool = False) -> Options:
+    """Chrome options for one pooled instance, with its own debug port and profile."""
+    chrome_options = Options()
+    chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+    chrome_options.add_argument("--start-maximized")
+    chrome_options.add_argument("--disable-extensions")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument(f"--remote-debugging-port={debug_port}")
+    chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    if network_capture_enabled():
+        # Lets NetworkCapture read the Sales Navigator API responses over CDP
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return chrome_options
+
+
+class PooledBrowser:
+    def __init__(self, driver: webdriver.Chrome, debug_port: int, profile_dir: str):
+        self.driver = driver
+        self.async_driver = AsyncDriver(driver, name=f"driver-{debug_port}")
+        self.debug_port = debug_port
+        self.profile_dir = profile_dir
+        self.created_at = time.time()
+        self.leases = 0
+
+    def __repr__(self):
+        return f"PooledBrowser(port={self.debug_port}, leases={self.leases})"
+
+
+class BrowserPool:
+    """
+    Keeps between `min_size` and `max_size` pre-launched Chrome instances.
+    Every instance gets its own remote debugging port and profile directory,
+    and is handed to `authenticate` before it becomes available for lease.
+    """
+
+    def __init__(self, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE, base_debug_port=POOL_BASE_DEBUG_PORT,
+                 profile_root=POOL_PROFILE_ROOT, headless=POOL_HEADLESS, authenticate=None):
+        if min_size > max_size:
+            raise ValueError("min_size must not be greater than max_size")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.base_debug_port = base_debug_port
+        self.profile_root = profile_root
+        self.headless = headless
+        self.authenticate = authenticate
+        self._idle: list[PooledBrowser] = []
+        self._leased: set[PooledBrowser] = set()
+        self._used_ports: set[int] = set()
+        self._launching = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._leased) + self._launching
+
+    def start(self):
+        """Pre-launch `min_size` instances in the background."""
+        threading.Thread(target=self._fill, name="browser-pool-prewarm", daemon=True).start()
+
+    def lease(self, timeout: float = LEASE_TIMEOUT) -> PooledBrowser:
+        """Borrow a healthy, authenticated browser. Launches one if the pool is below `max_size`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("Browser pool is closed")
+                browser = self._idle.pop() if self._idle else None
+                if browser is None:
+                    if self.size < self.max_size:
+                        port = self._allocate_port()
+                        self._launching += 1
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise TimeoutError(f"No browser available after {timeout}s (max_size={self.max_size})")
+                        self._cond.wait(remaining)
+                        continue
+
+            if browser is None:
+                try:
+                    browser = self._launch(port)
+                finally:
+                    with self._cond:
+                        self._launching -= 1
+                        if browser is None:
+                            self._used_ports.discard(port)
+                if browser is None:
+                    raise RuntimeError(f"Failed to launch browser on port {port}")
+            elif not self._is_healthy(browser):
+                logging.warning(f"Discarding unhealthy browser on port {browser.debug_port}")
+                self._quit(browser)
+                continue
+
+            with self._cond:
+                browser.leases += 1
+                self._leased.add(browser)
+            logging.info(f"Leased {browser}")
+            return browser
+
+    def lease_idle(self):
+        """Borrow an idle browser if there is one, without launching or waiting. Returns None otherwise."""
+        with self._cond:
+            if self._closed or not self._idle:
+                return None
+            browser = self._idle.pop()
+            browser.leases += 1
+            self._leased.add(browser)
+        logging.info(f"Leased idle {browser}")
+        return browser
+
+    def release(self, browser: PooledBrowser, discard: bool = False):
+        """Return a leased browser. Unhealthy or discarded browsers are quit and replaced in the background."""
+        with self._cond:
+            self._leased.discard(browser)
+        if discard or self._closed or not self._is_healthy(browser):
+            self._quit(browser)
+            self.start()
+            return
+        with self._cond:
+            self._idle.append(browser)
+            self._cond.notify()
+        logging.info(f"Released {browser}")
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            browsers = self._idle + list(self._leased)
+            self._idle = []
+            self._leased = set()
+            self._cond.notify_all()
+        for browser in browsers:
+            self._quit(browser)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "launching": self._launching,
+                "minSize": self.min_size,
+                "maxSize": self.max_size,
+            }
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                if self._closed or self.size >= self.min_size:
+                    return
+                port = self._allocate_port()
+                self._launching += 1
+            browser = None
+            try:
+                browser = self._launch(port)
+            finally:
+                with self._cond:
+                    self._launching -= 1
+                    if browser is None:
+                        self._used_ports.discard(port)
+            with self._cond:
+                if browser is None:
+                    return
+                self._idle.append(browser)
+                self._cond.notify()
+
+    def _allocate_port(self) -> int:
+        port = self.base_debug_port
+        while port in self._used_ports:
+            port += 1
+        self._used_ports.add(port)
+        return port
+
+    def _launch(self, port: int):
+        profile_dir = os.path.join(self.profile_root, f"profile-{port}")
+        os.makedirs(profile_dir, exist_ok=True)
+        logging.info(f"Launching Chrome on debug port {port} with profile {profile_dir}")
+        try:
+            driver = webdriver.Chrome(options=build_chrome_options(port, profile_dir, self.headless))
+        except Exception as e:
+            logging.error(f"Error initializing ChromeDriver on port {port}: {e}")
+            return None
+        browser = PooledBrowser(driver, port, profile_dir)
+        try:
+            if network_capture_enabled():
+                NetworkCapture(driver).enable()
+            authenticated = not self.authenticate or self.authenticate(driver)
+            if not authenticated:
+                logging.error(f"Authentication failed for browser on port {port}")
+        except Exception as e:
+            logging.error(f"Error preparing browser on port {port}: {e}")
+            authenticated = False
+        if not authenticated:
+            self._quit(browser)
+            return None
+        return browser
+
+    def _is_healthy(self, browser: PooledBrowser) -> bool:
+        # On the driver thread, like every other command sent to this browser
+        try:
+            return browser.async_driver.call(self._probe, browser.driver)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _probe(driver: webdriver.Chrome) -> bool:
+        driver.execute_script("return 1")
+        return '/login' not in driver.current_url
+
+    def _quit(self, browser: PooledBrowser):
+        try:
+            # Straight from the caller, so closing the pool can stop a browser whose thread is busy
+            browser.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting browser on port {browser.debug_port}: {e}")
+        browser.async_driver.shutdown()
+        with self._cond:
+            self._used_ports.discard(browser.debug_port)
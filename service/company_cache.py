@@ -0,0 +1,37 @@
+import os
+import logging
+from dotenv import load_dotenv
+from selenium import webdriver
+from utils.sqlite_cache import SqliteCache
+from utils.linkedin_url import LinkedInRef, COMPANY, company_id
+from service.company_service import scrape_company
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+LINKEDIN_CACHE_PATH = os.getenv("LINKEDIN_CACHE_PATH", "cache/linkedin.sqlite3")
+COMPANY_CACHE_TTL = int(os.getenv("COMPANY_CACHE_TTL_DAYS", "30")) * 24 * 3600
+COMPANY_CACHE_MAX_ENTRIES = int(os.getenv("COMPANY_CACHE_MAX_ENTRIES", "50000"))
+
+company_cache = SqliteCache(LINKEDIN_CACHE_PATH, "company", ttl=COMPANY_CACHE_TTL, max_entries=COMPANY_CACHE_MAX_ENTRIES)
+
+
+def is_scraped(record: dict) -> bool:
+    # A page that failed to load comes back all "NULL"; don't pin that for a month
+    return any(value != "NULL" for value in record.values())
+
+
+def get_company(driver: webdriver.Chrome, company_link: str, capture=None) -> dict:
+    """
+    Company record for `company_link`, from the cache when another lead or job
+    already fetched it, otherwise scraped once even if several jobs ask at the same time.
+    """
+    key = company_id(company_link)
+    if key is None:
+        return scrape_company(driver, company_link, capture=capture)
+
+    def fetch():
+        logging.info(f"Company {key} not cached, scraping {company_link}")
+        return scrape_company(driver, LinkedInRef(COMPANY, key).url, capture=capture)
+
+    return company_cache.get_or_fetch(key, fetch, should_cache=is_scraped)
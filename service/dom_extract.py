@@ -0,0 +1,93 @@
+import logging
+from selenium import webdriver
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# A field spec maps a field name to its ordered fallback candidates:
+#   {"css": "..."} or {"xpath": "..."}   where to look, relative to each root element
+#   "attr": "text" (default), "href" or any attribute name
+#   "all": True                           collect every match into a list instead of the first
+#   "replace": [[old, new], ...]          string clean-up applied to the value
+# The whole spec is evaluated in the page with ONE execute_script call.
+
+EXTRACT_SCRIPT = """
+const [rootSelector, spec] = arguments;
+
+function valueOf(node, candidate) {
+    const attr = candidate.attr || 'text';
+    let value;
+    if (attr === 'text') {
+        value = node.nodeType === Node.TEXT_NODE ? node.textContent : (node.innerText || node.textContent);
+    } else if (attr === 'href') {
+        value = node.href || node.getAttribute('href');
+    } else {
+        value = node.getAttribute ? node.getAttribute(attr) : null;
+    }
+    if (value === null || value === undefined) return null;
+    value = String(value);
+    for (const [from, to] of (candidate.replace || [])) value = value.split(from).join(to);
+    value = value.trim();
+    return value ? value : null;
+}
+
+function nodesOf(root, candidate) {
+    if (candidate.css) return Array.from(root.querySelectorAll(candidate.css));
+    const result = document.evaluate(candidate.xpath, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+    return nodes;
+}
+
+function extract(root) {
+    const values = {}, hits = {}, timings = {};
+    for (const [field, candidates] of Object.entries(spec)) {
+        values[field] = null;
+        hits[field] = -1;
+        timings[field] = [];
+        for (let i = 0; i < candidates.length; i++) {
+            const candidate = candidates[i];
+            const started = performance.now();
+            const nodes = nodesOf(root, candidate);
+            let value;
+            if (candidate.all) {
+                value = nodes.map(node => valueOf(node, candidate)).filter(v => v !== null);
+                if (!value.length) value = null;
+            } else {
+                value = null;
+                for (const node of nodes) {
+                    value = valueOf(node, candidate);
+                    if (value !== null) break;
+                }
+            }
+            timings[field].push(performance.now() - started);
+            if (value !== null) {
+                values[field] = value;
+                hits[field] = i;
+                break;
+            }
+        }
+    }
+    return {values: values, hits: hits, timings: timings};
+}
+
+const roots = rootSelector ? Array.from(document.querySelectorAll(rootSelector)) : [document];
+return roots.map(extract);
+"""
+
+
+def extract(driver: webdriver.Chrome, spec: dict, root_selector: str = None) -> list:
+    """
+    Evaluates `spec` against every element matching `root_selector` (or the
+    whole document) in one round trip. Returns one {"values", "hits"} dict per
+    root, where hits[field] is the index of the candidate that matched or -1
+    and timings[field] lists the milliseconds spent on each candidate tried.
+    """
+    return driver.execute_script(EXTRACT_SCRIPT, root_selector, spec) or []
+
+
+def extract_records(driver: webdriver.Chrome, spec: dict, root_selector: str = None, default=None) -> list:
+    """Like `extract`, but returns plain records with missing fields set to `default`."""
+    records = []
+    for result in extract(driver, spec, root_selector):
+        records.append({field: (value if value is not None else default) for field, value in result["values"].items()})
+    return records
@@ -0,0 +1,161 @@
+import io
+import os
+import csv
+import json
+import zlib
+import asyncio
+import tempfile
+from typing import AsyncIterator
+from openpyxl import Workbook
+from database.postgres import create_async_session
+from schema.entity.lead import Lead
+from service.results_service import leads_query, after_cursor, cursor_of, to_result
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXPORT_CHUNK_SIZE = 1000
+FILE_READ_SIZE = 256 * 1024
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+EXPORT_COMPRESSIONS = {
+    "none": ("", None),
+    "gzip": (".gz", "application/gzip"),
+    "zstd": (".zst", "application/zstd"),
+}
+
+COLUMNS = list(to_result(Lead()).keys())
+
+
+class ExportError(ValueError):
+    pass
+
+
+def check_export(format: str, compression: str):
+    if format not in EXPORT_FORMATS:
+        raise ExportError(f"Unsupported format `{format}`, use one of {', '.join(EXPORT_FORMATS)}")
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ExportError(f"Unsupported compression `{compression}`, use one of {', '.join(EXPORT_COMPRESSIONS)}")
+    if format == "parquet" and pyarrow is None:
+        raise ExportError("Parquet export needs the optional `pyarrow` package")
+    if compression == "zstd" and zstandard is None:
+        raise ExportError("zstd compression needs the optional `zstandard` package")
+
+
+def export_filename(session_id: str, format: str, compression: str) -> str:
+    return f"{session_id}_leads.{EXPORT_FORMATS[format][1]}{EXPORT_COMPRESSIONS[compression][0]}"
+
+
+def export_media_type(format: str, compression: str) -> str:
+    return EXPORT_COMPRESSIONS[compression][1] or EXPORT_FORMATS[format][0]
+
+
+async def result_chunks(session_id: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> AsyncIterator[list]:
+    """A session's leads in chunks, keyset-paged so no query or transaction spans the whole export."""
+    cursor = None
+    while True:
+        query = leads_query(session_id)
+        if cursor:
+            query = after_cursor(query, cursor)
+        async with create_async_session() as session:
+            rows = (await session.execute(query.limit(chunk_size))).all()
+        if not rows:
+            return
+        yield [to_result(*row) for row in rows]
+        if len(rows) < chunk_size:
+            return
+        cursor = cursor_of(rows[-1][0])
+
+
+async def _csv(chunks) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=COLUMNS)
+    writer.writeheader()
+    async for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _ndjson(chunks) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        yield "".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in chunk).encode("utf-8")
+
+
+async def _stream_file(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as file:
+        while True:
+            data = await asyncio.to_thread(file.read, FILE_READ_SIZE)
+            if not data:
+                return
+            yield data
+
+
+async def _xlsx(chunks) -> AsyncIterator[bytes]:
+    # XLSX is a zip archive that can only be read once it is complete, so rows are
+    # streamed into a write-only workbook on disk (constant memory) and the file is
+    # sent when done.
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.xlsx")
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Leads")
+        sheet.append(COLUMNS)
+        async for chunk in chunks:
+            await asyncio.to_thread(lambda: [sheet.append([row[column] for column in COLUMNS]) for row in chunk])
+        await asyncio.to_thread(workbook.save, path)
+        async for data in _stream_file(path):
+            yield data
+
+
+async def _parquet(chunks) -> AsyncIterator[bytes]:
+    # One row group per chunk; like XLSX the footer is written last, so the file is sent when done
+    schema = pyarrow.schema([(column, pyarrow.int64() if column == "relevanceScore" else pyarrow.string()) for column in COLUMNS])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.parquet")
+        writer = pyarrow.parquet.ParquetWriter(path, schema)
+        try:
+            async for chunk in chunks:
+                table = pyarrow.Table.from_pylist(chunk, schema=schema)
+                await asyncio.to_thread(writer.write_table, table)
+        finally:
+            writer.close()
+        async for data in _stream_file(path):
+            yield data
+
+
+async def _compress(stream, compression: str) -> AsyncIterator[bytes]:
+    if compression == "none":
+        async for data in stream:
+            yield data
+        return
+    if compression == "gzip":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    else:
+        compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    async for data in stream:
+        compressed = compressor.compress(data)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_leads(session_id: str, format: str = "csv", compression: str = "none") -> AsyncIterator[bytes]:
+    """Byte stream of a session's leads in `format`, optionally compressed. Call `check_export` first."""
+    writers = {"csv": _csv, "ndjson": _ndjson, "xlsx": _xlsx, "parquet": _parquet}
+    return _compress(writers[format](result_chunks(session_id)), compression)
@@ -0,0 +1,92 @@
+import json
+import time
+import asyncio
+import threading
+from typing import AsyncIterator, Optional
+from service.artifact_store import ArtifactStore
+
+EVENTS = "events.jsonl"
+POLL_INTERVAL = 0.5
+
+# Event types
+JOB_STARTED = "job_started"
+FILTERS_APPLIED = "filters_applied"
+SHARDS_PLANNED = "shards_planned"
+PAGE_SCRAPED = "page_scraped"
+LEAD_FOUND = "lead_found"
+LEAD_ENRICHED = "lead_enriched"
+JOB_FINISHED = "job_finished"
+JOB_FAILED = "job_failed"
+TERMINAL_EVENTS = (JOB_FINISHED, JOB_FAILED)
+
+
+class JobEvents:
+    """
+    Progress log of one scrape job, one JSON event per line in the job's
+    artifact store. Events carry a sequence number that clients use as a
+    resume cursor. The worker appends and the API tails the file, so
+    the two don't have to share a process.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.store = ArtifactStore(session_id)
+        self._lock = threading.Lock()
+        self._seq = None
+
+    def emit(self, type: str, **data):
+        with self._lock:
+            if self._seq is None:
+                # A retried job continues the numbering of the previous attempt
+                self._seq = len(read_events(self.session_id))
+            self._seq += 1
+            event = {"seq": self._seq, "type": type, "ts": time.time(), "data": data}
+            self.store.append_line(EVENTS, json.dumps(event, ensure_ascii=False, default=str))
+
+
+def read_events(session_id: str, cursor: int = 0, offset: int = 0) -> list:
+    """Events after sequence number `cursor`, reading the log from byte `offset`."""
+    return _read_from(session_id, cursor, offset)[0]
+
+
+def _read_from(session_id: str, cursor: int, offset: int) -> tuple:
+    """Events of the complete lines after byte `offset` whose seq is above `cursor`, and the offset read up to."""
+    path = ArtifactStore(session_id).path(EVENTS)
+    events = []
+    try:
+        with open(path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                offset += len(line)
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if event["seq"] > cursor:
+                    events.append(event)
+    except FileNotFoundError:
+        pass
+    return events, offset
+
+
+async def follow_events(session_id: str, cursor: int = 0, poll_interval: float = POLL_INTERVAL,
+                        stop_after_terminal: bool = True) -> AsyncIterator[Optional[dict]]:
+    """
+    Yields the job's events after `cursor` as they are written, and None
+    on every idle poll so callers can send keep-alives. Ends after a
+    finished/failed event unless `stop_after_terminal` is False.
+    """
+    offset = 0
+    while True:
+        batch, offset = await asyncio.to_thread(_read_from, session_id, cursor, offset)
+        for event in batch:
+            cursor = event["seq"]
+            yield event
+            # A retried job logs more events after a failure, so only the latest one ends the stream
+            if stop_after_terminal and event is batch[-1] and event["type"] in TERMINAL_EVENTS:
+                return
+        if not batch:
+            yield None
+        await asyncio.sleep(poll_interval)
@@ -0,0 +1,52 @@
+import os
+import json
+import shutil
+import logging
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+JOURNAL_DIR = os.getenv("JOB_JOURNAL_DIR", "journal")
+
+
+class JobJournal:
+    """
+    Append-only checkpoint log for one stage of a scrape job.
+    Every processed lead/company is written as one fsync'd JSON line, so a
+    crashed or redeployed job can resume from the last committed record.
+    """
+
+    def __init__(self, session_id: str, stage: str, journal_dir: str = JOURNAL_DIR):
+        self.session_id = session_id
+        self.stage = stage
+        self.path = os.path.join(journal_dir, session_id, f"{stage}.jsonl")
+
+    def load(self) -> dict:
+        """Committed records by key. A torn last line (crash mid-write) is ignored."""
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    logging.warning(f"Ignoring incomplete journal line in {self.path}")
+                    continue
+                records[entry["key"]] = entry["record"]
+        return records
+
+    def append(self, key: str, record: dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps({"key": key, "record": record}, ensure_ascii=False)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def discard_job(session_id: str, journal_dir: str = JOURNAL_DIR):
+        shutil.rmtree(os.path.join(journal_dir, session_id), ignore_errors=True)
@@ -0,0 +1,166 @@
+import logging
+from datetime import timedelta
+from sqlalchemy import select, update, or_, and_, case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from database.postgres import create_async_session, engine_sqlalchemy
+from schema.entity.scrape_job import ScrapeJob
+from utils.constant import ConstantsJob
+from utils.date_convert import gmt7now
+from utils.uuid import str_of_uuid7
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+LEASE_SECONDS = 120
+
+
+# ------------- API side (async engine)
+
+async def enqueue_job(session_id: str, payload: dict, criteria_hash: str = None, idempotency_key: str = None) -> ScrapeJob:
+    """
+    Persist a scrape job and return it. Workers pick it up from the queue.
+    If a queued or running job already holds `idempotency_key` that job is
+    returned instead, so it may belong to another session.
+    """
+    if idempotency_key:
+        existing = await get_active_job(idempotency_key)
+        if existing:
+            logging.info(f"Session {session_id} joined active job {existing.id} (idempotency key {idempotency_key})")
+            return existing
+    job = ScrapeJob(
+        id=str_of_uuid7(), session_id=session_id, payload=payload, status=ConstantsJob.QUEUED, attempts=0, max_attempts=3,
+        criteria_hash=criteria_hash, idempotency_key=idempotency_key,
+    )
+    try:
+        async with create_async_session() as session:
+            session.add(job)
+    except IntegrityError:
+        # An identical submission enqueued between our check and insert
+        existing = await get_active_job(idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        logging.info(f"Session {session_id} joined active job {existing.id} (idempotency key {idempotency_key})")
+        return existing
+    logging.info(f"Enqueued scrape job {job.id} for session {session_id}")
+    return job
+
+
+async def get_active_job(idempotency_key: str):
+    """The queued or running job holding `idempotency_key`, if any."""
+    async with create_async_session() as session:
+        result = await session.execute(
+            select(ScrapeJob)
+            .where(ScrapeJob.idempotency_key == idempotency_key, ScrapeJob.status.in_((ConstantsJob.QUEUED, ConstantsJob.RUNNING)))
+            .limit(1)
+        )
+        return result.scalars().first()
+
+
+async def get_cached_job(criteria_hash: str, max_age: timedelta):
+    """The latest job for `criteria_hash` that finished within `max_age`, if any."""
+    async with create_async_session() as session:
+        result = await session.execute(
+            select(ScrapeJob)
+            .where(
+                ScrapeJob.criteria_hash == criteria_hash,
+                ScrapeJob.status == ConstantsJob.DONE,
+                ScrapeJob.updated_at >= gmt7now() - max_age,
+            )
+            .order_by(ScrapeJob.updated_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+
+async def get_latest_job(session_id: str):
+    async with create_async_session() as session:
+        result = await session.execute(
+            select(ScrapeJob)
+            .where(ScrapeJob.session_id == session_id)
+            .order_by(ScrapeJob.created_at.desc())
+            .limit(1)
+        )
+        return result.scalars().first()
+
+
+# ------------- worker side (sync engine)
+
+def claim_job(worker_id: str, lease_seconds: int = LEASE_SECONDS):
+    """
+    Atomically claim the oldest queued job, or a running job whose lease has
+    expired. Returns the claimed ScrapeJob or None.
+    """
+    now = gmt7now()
+    with Session(engine_sqlalchemy, expire_on_commit=False) as session, session.begin():
+        claimable = or_(
+            ScrapeJob.status == ConstantsJob.QUEUED,
+            and_(ScrapeJob.status == ConstantsJob.RUNNING, ScrapeJob.lease_expires_at < now),
+        )
+        job = session.execute(
+            select(ScrapeJob)
+            .where(claimable, ScrapeJob.attempts < ScrapeJob.max_attempts)
+            .order_by(ScrapeJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        ).scalars().first()
+        if job is None:
+            return None
+        job.status = ConstantsJob.RUNNING
+        job.lease_owner = worker_id
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        job.attempts += 1
+    logging.info(f"Worker {worker_id} claimed job {job.id} (attempt {job.attempts}/{job.max_attempts})")
+    return job
+
+
+def extend_lease(job_id: str, worker_id: str, lease_seconds: int = LEASE_SECONDS) -> bool:
+    """Heartbeat for a running job. Returns False if the lease was lost to another worker."""
+    with engine_sqlalchemy.begin() as conn:
+        result = conn.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == job_id, ScrapeJob.lease_owner == worker_id, ScrapeJob.status == ConstantsJob.RUNNING)
+            .values(lease_expires_at=gmt7now() + timedelta(seconds=lease_seconds), updated_at=func.now())
+        )
+        return result.rowcount == 1
+
+
+def complete_job(job_id: str, worker_id: str):
+    with engine_sqlalchemy.begin() as conn:
+        conn.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == job_id, ScrapeJob.lease_owner == worker_id)
+            .values(status=ConstantsJob.DONE, lease_owner=None, lease_expires_at=None, updated_at=func.now())
+        )
+
+
+def fail_job(job_id: str, worker_id: str, error: str):
+    """Requeue the job for another attempt, or mark it failed once attempts are exhausted."""
+    with engine_sqlalchemy.begin() as conn:
+        conn.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == job_id, ScrapeJob.lease_owner == worker_id)
+            .values(
+                status=case(
+                    (ScrapeJob.attempts < ScrapeJob.max_attempts, ConstantsJob.QUEUED),
+                    else_=ConstantsJob.FAILED,
+                ),
+                lease_owner=None,
+                lease_expires_at=None,
+                error=error,
+                updated_at=func.now(),
+            )
+        )
+
+
+def fail_abandoned_jobs():
+    """Mark jobs whose lease expired on their final attempt as failed."""
+    with engine_sqlalchemy.begin() as conn:
+        conn.execute(
+            update(ScrapeJob)
+            .where(
+                ScrapeJob.status == ConstantsJob.RUNNING,
+                ScrapeJob.lease_expires_at < gmt7now(),
+                ScrapeJob.attempts >= ScrapeJob.max_attempts,
+            )
+            .values(status=ConstantsJob.FAILED, error="Lease expired on final attempt", updated_at=func.now())
+        )
@@ -0,0 +1,39 @@
+import os
+import logging
+from dotenv import load_dotenv
+from selenium import webdriver
+from utils.sqlite_cache import SqliteCache
+from utils.linkedin_url import member_id
+from service.info_service import scrape_lead_contact
+from service.company_cache import LINKEDIN_CACHE_PATH
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Contact details change more often than company pages, so the default freshness is shorter
+LEAD_CACHE_TTL = int(os.getenv("LEAD_CACHE_TTL_DAYS", "14")) * 24 * 3600
+LEAD_CACHE_MAX_ENTRIES = int(os.getenv("LEAD_CACHE_MAX_ENTRIES", "200000"))
+
+lead_cache = SqliteCache(LINKEDIN_CACHE_PATH, "lead", ttl=LEAD_CACHE_TTL, max_entries=LEAD_CACHE_MAX_ENTRIES)
+
+
+def is_scraped(record: dict) -> bool:
+    # A profile that failed to load comes back all "NULL"
+    return any(value != "NULL" for value in record.values())
+
+
+def get_lead_contact(driver: webdriver.Chrome, profile_link: str, capture=None) -> dict:
+    """
+    Contact, About and LinkedIn URL of a lead. Profiles scraped within the
+    freshness window (by any job) are served from the cache; only stale or
+    unknown ones are visited.
+    """
+    key = member_id(profile_link)
+    if key is None:
+        return scrape_lead_contact(driver, profile_link, capture=capture)
+
+    def fetch():
+        logging.info(f"Lead {key} not cached or stale, visiting profile")
+        return scrape_lead_contact(driver, profile_link, capture=capture)
+
+    return lead_cache.get_or_fetch(key, fetch, should_cache=is_scraped)
@@ -1,15 +1,13 @@
 from schema.entity.leads_summary import LeadsSummaryTable
 from schema.entity.column import Column
-import asyncio
 from .nav4 import main_scrape_leads
-from .info_service import scrape_contact_info
 from .util_service import get_cookies
+from .job_queue import enqueue_job
+from .query_planner import plan_query
 from selenium import webdriver
 
 # ini untuk iterasi akhir
 
-job_status_dict = {}
-
 
 def init():
     layout = [
@@ -46,34 +44,34 @@ def check_session():
     return cookies
 
 
-def start_search_leads_task(session_id: str, data: dict, driver: webdriver.Chrome):
-    job_status_dict[session_id] = None
-    asyncio.create_task(search_leads(session_id=session_id, data=data, driver=driver))    
-    return session_id
-
-
-async def search_leads(session_id: str, data: dict, driver: webdriver.Chrome):
-    """Performs the lead search and scraping."""
-    # logger.info(f"search_leads: Starting lead scraping for session_id: {session_id}")
+async def start_search_leads_task(session_id: str, data: dict):
+    """
+    Enqueue the scrape on the durable job queue; a worker process picks it up.
+    Returns the job, which is an already active one if the session's idempotency key is taken.
+    """
+    return await enqueue_job(session_id, data["payload"], criteria_hash=data.get("criteriaHash"), idempotency_key=data.get("idempotencyKey"))
 
-    try:
-        main_scrape_leads(
-            session_id=session_id, # Pass session_id 
-            driver=driver, # **Pass the driver argument!**
-            industry=data["payload"]["industry"], 
-            job_title=data["payload"]["jobTitle"], 
-            seniority_level=data["payload"]["seniorityLevel"], 
-            years_of_experience=data["payload"]["yearsOfExperience"] # Pass years_of_experience
-        )
-        job_status_dict[session_id] = None
-        # logger.info(f"search_leads: Lead scraping COMPLETED for session_id: {session_id}")
-
-    except Exception as e:
-        # logger.error(f"search_leads: Error during lead scraping for session_id {session_id}: {e}", exc_info=True)
-        job_status_dict[session_id] = "Error"
-        raise  # Re-raise exception to be handled by endpoint
 
+def run_search_leads_job(session_id: str, payload: dict, driver: webdriver.Chrome, resume: bool = False, enrich_drivers: tuple = (), shard_drivers: tuple = ()):
+    """
+    Performs the lead search and scraping. Runs on a worker's driver thread;
+    extra `enrich_drivers` let contact/company enrichment run alongside the search
+    and `shard_drivers` harvest slices of a large search in parallel.
+    """
+    main_scrape_leads(
+        session_id=session_id, # Pass session_id 
+        driver=driver, # **Pass the driver argument!**
+        industry=payload["industry"], 
+        job_title=payload["jobTitle"], 
+        seniority_level=payload["seniorityLevel"], 
+        years_of_experience=payload["yearsOfExperience"], # Pass years_of_experience
+        number_of_leads=payload["numberOfLeads"], # Stop scrolling once this many cards are loaded
+        resume=resume, # Continue from the journal of a previous attempt
+        enrich_drivers=enrich_drivers,
+        shard_drivers=shard_drivers,
+        plan=plan_query(payload)  # pushes functions/headcount into the search, checks cards before enrichment
+    )
     return {
         "sessionId": session_id,
         "data": None  # for download later
-    }
\ No newline at end of file
+    }
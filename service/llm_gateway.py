@@ -0,0 +1,243 @@
+import os
+import random
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+import httpx
+from dotenv import load_dotenv
+from config.ollama_settings import OllamaSettings
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+LLM_PROVIDERS = os.getenv("LLM_PROVIDERS", "groq,openai,ollama")  # fallback order
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))  # in-flight requests per provider
+LLM_BACKOFF_BASE = 0.5
+LLM_BACKOFF_MAX = 20
+RETRY_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    pass
+
+
+@dataclass
+class LLMResponse:
+    content: str
+    provider: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass
+class Provider:
+    """
+    One chat completion endpoint. `kind` is "openai" for the OpenAI-compatible
+    /chat/completions API (OpenAI, Groq) or "ollama" for Ollama's /api/chat.
+    """
+    name: str
+    kind: str
+    base_url: str
+    model: str
+    api_key: Optional[str] = None
+    timeout: float = LLM_TIMEOUT
+    concurrency: int = LLM_CONCURRENCY
+    options: dict = field(default_factory=dict)
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.model) and (self.kind == "ollama" or bool(self.api_key))
+
+
+def providers_from_env() -> List[Provider]:
+    overrides = {"api_base": os.getenv("OLLAMA_API_BASE"), "llm_model": os.getenv("OLLAMA_MODEL")}
+    ollama = OllamaSettings(**{key: value for key, value in overrides.items() if value})
+    known = {
+        "groq": Provider(
+            name="groq", kind="openai",
+            base_url=os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1"),
+            model=os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile"),
+            api_key=os.getenv("GROQ_API_KEY"),
+            concurrency=int(os.getenv("GROQ_CONCURRENCY", LLM_CONCURRENCY)),
+        ),
+        "openai": Provider(
+            name="openai", kind="openai",
+            base_url=os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+            model=os.getenv("OPENAI_MODEL", "gpt-4o"),
+            api_key=os.getenv("OPENAI_API_KEY"),
+            concurrency=int(os.getenv("OPENAI_CONCURRENCY", LLM_CONCURRENCY)),
+        ),
+        "ollama": Provider(
+            name="ollama", kind="ollama",
+            base_url=ollama.api_base,
+            model=ollama.llm_model,
+            timeout=ollama.request_timeout,
+            concurrency=int(os.getenv("OLLAMA_CONCURRENCY", "1")),
+            options={
+                key: value for key, value in {
+                    "tfs_z": ollama.tfs_z,
+                    "num_predict": ollama.num_predict,
+                    "top_k": ollama.top_k,
+                    "top_p": ollama.top_p,
+                    "repeat_last_n": ollama.repeat_last_n,
+                    "repeat_penalty": ollama.repeat_penalty,
+                }.items() if value is not None
+            },
+        ),
+    }
+    return [known[name.strip()] for name in LLM_PROVIDERS.split(",") if name.strip() in known]
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff before retry `attempt` + 1, at least a (capped) Retry-After in seconds."""
+    delay = random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+    if retry_after and retry_after.isdigit():
+        delay = max(delay, min(float(retry_after), LLM_BACKOFF_MAX))
+    return delay
+
+
+class LLMGateway:
+    """
+    Chat completions through the first provider that answers. One pooled
+    httpx.AsyncClient serves all providers from a dedicated event loop
+    thread, so both async callers (`chat`) and the blocking scraper code
+    (`complete`) share connections. Each provider has a concurrency limit;
+    timeouts, 429s and 5xx are retried with jittered exponential backoff
+    before falling back to the next provider. Token usage is counted per
+    provider (see `usage`).
+    """
+
+    def __init__(self, providers: List[Provider], max_retries: int = LLM_MAX_RETRIES, transport: httpx.AsyncBaseTransport = None):
+        self.providers = providers
+        self.max_retries = max_retries
+        self.transport = transport  # e.g. httpx.MockTransport to run against a stub
+        self._usage = {provider.name: {"requests": 0, "failures": 0, "promptTokens": 0, "completionTokens": 0} for provider in providers}
+        self._usage_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._loop = None
+        self._client = None
+        self._semaphores = {}
+
+    @classmethod
+    def from_env(cls) -> "LLMGateway":
+        return cls(providers_from_env())
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-gateway", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _get_client(self) -> httpx.AsyncClient:
+        # Created on the gateway loop, which the client and the semaphores are bound to
+        if self._client is None:
+            self._client = httpx.AsyncClient(limits=httpx.Limits(max_connections=50, max_keepalive_connections=20), transport=self.transport)
+            self._semaphores = {provider.name: asyncio.Semaphore(provider.concurrency) for provider in self.providers}
+        return self._client
+
+    async def chat(self, messages: List[dict], temperature: float = 0, json_output: bool = False) -> LLMResponse:
+        """Completion for `messages` from the first configured provider that succeeds; raises LLMError if none does."""
+        loop = self._ensure_loop()
+        coroutine = self._chat(messages, temperature, json_output)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coroutine
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
+
+    def complete(self, messages: List[dict], temperature: float = 0, json_output: bool = False) -> LLMResponse:
+        """Blocking `chat` for synchronous callers (scrapers, scripts). Don't call it from the gateway loop."""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._chat(messages, temperature, json_output), loop).result()
+
+    async def _chat(self, messages, temperature, json_output) -> LLMResponse:
+        client = await self._get_client()
+        errors = []
+        for provider in self.providers:
+            if not provider.configured:
+                continue
+            try:
+                response = await self._with_retries(client, provider, messages, temperature, json_output)
+            except Exception as e:
+                self._count(provider.name, failures=1)
+                logging.warning(f"LLM provider {provider.name} failed, trying the next one: {e}")
+                errors.append(f"{provider.name}: {e}")
+                continue
+            self._count(provider.name, requests=1, promptTokens=response.prompt_tokens, completionTokens=response.completion_tokens)
+            return response
+        raise LLMError("No LLM provider succeeded" + (f" ({'; '.join(errors)})" if errors else ", none is configured"))
+
+    async def _with_retries(self, client, provider, messages, temperature, json_output) -> LLMResponse:
+        for attempt in range(self.max_retries + 1):
+            try:
+                # A slot per attempt, so backing off doesn't hold the provider's slots
+                async with self._semaphores[provider.name]:
+                    return await self._request(client, provider, messages, temperature, json_output)
+            except (httpx.TimeoutException, httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in RETRY_STATUS
+                if not retryable or attempt == self.max_retries:
+                    raise
+                retry_after = e.response.headers.get("Retry-After") if isinstance(e, httpx.HTTPStatusError) else None
+                delay = backoff_delay(attempt, retry_after)
+                logging.info(f"LLM provider {provider.name} attempt {attempt + 1} failed ({e!r}), retrying in {delay:.1f}s")
+                await self._sleep(delay)
+
+    async def _sleep(self, delay: float):
+        await asyncio.sleep(delay)
+
+    async def _request(self, client, provider, messages, temperature, json_output) -> LLMResponse:
+        if provider.kind == "ollama":
+            body = {"model": provider.model, "messages": messages, "stream": False, "options": {**provider.options, "temperature": temperature}}
+            if json_output:
+                body["format"] = "json"
+            response = await client.post(f"{provider.base_url.rstrip('/')}/api/chat", json=body, timeout=provider.timeout)
+            response.raise_for_status()
+            data = response.json()
+            return LLMResponse(
+                content=data["message"]["content"], provider=provider.name, model=provider.model,
+                prompt_tokens=data.get("prompt_eval_count", 0), completion_tokens=data.get("eval_count", 0),
+            )
+        body = {"model": provider.model, "messages": messages, "temperature": temperature}
+        if json_output:
+            body["response_format"] = {"type": "json_object"}
+        response = await client.post(
+            f"{provider.base_url.rstrip('/')}/chat/completions", json=body, timeout=provider.timeout,
+            headers={"Authorization": f"Bearer {provider.api_key}"},
+        )
+        response.raise_for_status()
+        data = response.json()
+        usage = data.get("usage") or {}
+        return LLMResponse(
+            content=data["choices"][0]["message"]["content"], provider=provider.name, model=data.get("model", provider.model),
+            prompt_tokens=usage.get("prompt_tokens", 0), completion_tokens=usage.get("completion_tokens", 0),
+        )
+
+    def _count(self, name: str, **counts):
+        with self._usage_lock:
+            for key, value in counts.items():
+                self._usage[name][key] += value or 0
+
+    def usage(self) -> dict:
+        with self._usage_lock:
+            return {name: dict(counts) for name, counts in self._usage.items()}
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop = None
+        self._client = None
+
+
+llm_gateway = LLMGateway.from_env()
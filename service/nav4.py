@@ -9,17 +9,20 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException, ElementClickInterceptedException
-from dotenv import load_dotenv
-from fuzzywuzzy import process
-from utils.constant import StaticValue
 from service.util_service import perform_login, configure_driver, close_overlay_if_present
-from openai import OpenAI
+from service.llm_gateway import llm_gateway
 import logging
 import pandas as pd
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.keys import Keys
-from service.info_service import scrape_contact_info, iterasi_csv
-from service.company_service import company_info
+from service.pipeline import LeadPipeline, save_results
+from service.job_events import FILTERS_APPLIED, PAGE_SCRAPED, SHARDS_PLANNED
+from service.selector_registry import selector_registry
+from utils.linkedin_url import member_id
+from service.search_query import build_search_url, filter_ids, SEARCH_URL
+from service.shard_planner import plan_shards, run_shards, SEARCH_RESULT_CAP
+from urllib.parse import unquote
+from service.network_capture import SEARCH_PATTERN, parse_search_leads
 import traceback
 
 WAIT_TIMEOUT = 30
@@ -27,20 +30,34 @@ SHORT_TIMEOUT = 10
 MAX_RETRIES = 3
 YEAR_EXPERIENCE = ["Less than 1 year", "1 to 2 years", "3 to 5 years", "6 to 10 years", "More than 10 years"]
 
-def get_closest_match(extracted_value, options_list, score_cutoff=80):
-    print(f"get_closest_match called with extracted_value: {extracted_value}, type: {type(extracted_value)}")
-    if extracted_value is None:
-        return None
-    extracted_value_str = str(extracted_value)
-    print(f"After str() conversion, extracted_value_str: {extracted_value_str}, type: {type(extracted_value_str)}")
-    print(f"Options list (YEAR_EXPERIENCE): {options_list}")
-    best_match_tuple = process.extractOne(extracted_value_str, options_list)
-    if best_match_tuple:
-        best_match, score = best_match_tuple
-        print(f"fuzzywuzzy result: best_match: {best_match}, score: {score}")
-        if score >= score_cutoff:
-            return best_match
-    return None
+PAGE_SIZE = 25  # lead cards per Sales Navigator results page
+LEAD_CARD_SELECTOR = "li.artdeco-list__item.pl3.pv3"
+LEAD_CARD_READY_SELECTOR = LEAD_CARD_SELECTOR + " span[data-anonymize='person-name']"
+LEAD_CARD_FIELDS = {
+    "Name": [
+        {"css": "span[data-anonymize='person-name']"},
+        {"css": "a[data-anonymize='headshot-photo'] img", "attr": "alt", "replace": [["Go to ", ""], ["’s profile", ""]]},
+    ],
+    "Title": [
+        {"css": "div.artdeco-entity-lockup__subtitle span[data-anonymize='title']"},
+    ],
+    "Profile Link": [
+        {"css": "div.artdeco-entity-lockup__title a.ember-view", "attr": "href"},
+        {"css": "a[data-anonymize='headshot-photo']", "attr": "href"},
+    ],
+    "Location": [
+        {"css": "span[data-anonymize='location']"},
+    ],
+    "Company": [
+        {"css": "div.artdeco-entity-lockup__subtitle a"},
+        {"xpath": ".//div[@class='artdeco-entity-lockup__subtitle']//span[@class='separator--middot']/following-sibling::text()[1]", "replace": [["See more about", ""]]},
+        {"xpath": ".//div[@class='artdeco-entity-lockup__subtitle']//button[@class='entity-hovercard__a11y-trigger']", "attr": "aria-label", "replace": [["See more about ", ""]]},
+    ],
+    "Company Link": [
+        {"css": "a[data-anonymize='company-name']", "attr": "href"},
+    ],
+}
+selector_registry.register("lead_card", LEAD_CARD_FIELDS)
 
 def llm_analyze_criteria(criteria_text):
     prompt = ("Analyze the following candidate criteria text and determine which of the following 'good-to-have' criteria are applicable:\n"
@@ -51,10 +68,8 @@ def llm_analyze_criteria(criteria_text):
               f"\"{criteria_text}\"\n\n"
               "Return a JSON object with a key 'good_to_have' whose value is a list of the applicable criteria (choose from the above three) based on your analysis. "
               "Do not include any extra text.")
-    load_dotenv()
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(messages=[{"role": "user", "content": prompt}], model="gpt-4o")
-    raw_output = response.choices[0].message.content
+    response = llm_gateway.complete([{"role": "user", "content": prompt}], json_output=True)
+    raw_output = response.content
     logging.info(f"Raw LLM Good-to-Have Output: {raw_output}")
     try:
         return json.loads(raw_output)
@@ -62,267 +77,182 @@ def llm_analyze_criteria(criteria_text):
         logging.error(f"Error parsing LLM output for good-to-have criteria: {e}")
         return {"good_to_have": []}
 
-def apply_job_title_filter(driver, value):
-    print("Applying Job Title Filter...")
-    driver.get('https://www.linkedin.com/sales/search/people?viewAllFilters=true')
-    time.sleep(10)
-    job_title_fieldset = WebDriverWait(driver, 40).until(EC.element_to_be_clickable((By.XPATH, "//fieldset[@data-x-search-filter='CURRENT_TITLE']")))
-    driver.execute_script("arguments[0].scrollIntoView(true);", job_title_fieldset)
-    time.sleep(1)
-    job_title_fieldset.click()
-    job_title_input_xpath = "//fieldset[@data-x-search-filter='CURRENT_TITLE']//input[@type='text']"
-    job_title_input = WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH, job_title_input_xpath)))
-    job_title_input.send_keys(value)
-    print(f"Typed '{value}' into the job title filter input.")
-    time.sleep(1)
-    include_button_xpath = f'//div[@aria-label="Include “{value}” in Current job title filter"]'
-    try:
-        include_button = WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.XPATH, include_button_xpath)))
-        include_button.click()
-        print(f"Clicked 'Include' for job title '{value}'.")
-        time.sleep(2)
-    except Exception as e:
-        print(f"Error clicking 'Include' button for job title: {e}")
-
-def apply_seniority_filter(driver, matched_seniority):
-    print(f"Applying Seniority Level Filter for: '{matched_seniority}'...")
-    seniority_fieldset_xpath = "//fieldset[@data-x-search-filter='SENIORITY_LEVEL']"
-    expand_seniority_button_xpath = "//fieldset[@data-x-search-filter='SENIORITY_LEVEL']//button[@aria-expanded='false'][.//span[contains(text(), 'Expand')]]"
-    include_seniority_button_xpath = f'//li[@role="option"]//div[@aria-label="Include “{matched_seniority}” in Seniority level filter"]'
-    try:
-        seniority_fieldset = WebDriverWait(driver, 40).until(EC.element_to_be_clickable((By.XPATH, seniority_fieldset_xpath)))
-        driver.execute_script("arguments[0].scrollIntoView(true);", seniority_fieldset)
-        time.sleep(1)
-        seniority_fieldset.click()
-        expand_button = WebDriverWait(driver, 30).until(EC.element_to_be_clickable((By.XPATH, expand_seniority_button_xpath)))
-        expand_button.click()
-        print("Clicked 'Expand' button for Seniority Level filter.")
-        time.sleep(2)
-        print(f"Attempting to find 'Include' button for matched seniority: '{matched_seniority}' using XPath: {include_seniority_button_xpath}")
-        include_button = WebDriverWait(driver, 30).until(EC.element_to_be_clickable((By.XPATH, include_seniority_button_xpath)))
-        include_button.click()
-        print(f"Clicked 'Include' button for matched seniority level '{matched_seniority}'.")
-        time.sleep(2)
-    except Exception as e:
-        print(f"Error applying seniority level filter for '{matched_seniority}': {e}")
-
 def apply_industry_filter(driver, value):
+    """Includes `value` through the Industry typeahead. Returns True if it was clicked."""
     print("Applying Industry Filter...")
     industry = value
     if not industry:
         print("No industry extracted, skipping filter.\n")
-        return
+        return False
     industry_fieldset_xpath = "//fieldset[@data-x-search-filter='INDUSTRY']"
     industry_input_xpath = "//fieldset[@data-x-search-filter='INDUSTRY']//input[@type='text']"
     include_industry_button_xpath = f'//div[@aria-label="Include “{industry}” in Industry filter"]'
     try:
         industry_fieldset = WebDriverWait(driver, 40).until(EC.element_to_be_clickable((By.XPATH, industry_fieldset_xpath)))
         driver.execute_script("arguments[0].scrollIntoView(true);", industry_fieldset)
-        time.sleep(1)
         industry_fieldset.click()
         industry_input = WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH, industry_input_xpath)))
         industry_input.send_keys(industry)
         print(f"Typed '{industry}' into the industry filter input.")
-        time.sleep(1)
         include_button = WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.XPATH, include_industry_button_xpath)))
         include_button.click()
         print(f"Clicked 'Include' for industry '{industry}'.")
-        time.sleep(2)
     except Exception as e:
         print(f"Error applying industry filter: {e}")
+        return False
     print("Industry Filter Applied.\n")
+    return True
 
-def apply_years_experience_filter(driver, matched_experience):
-    print(f"Applying Years of Experience Filter for: '{matched_experience}'...")
-    years_experience_fieldset_xpath = "//fieldset[@data-x-search-filter='YEARS_AT_CURRENT_COMPANY']"
-    years_experience_dropdown_list_xpath = '//ul[@role="listbox" and @aria-label="Years in current company filter suggestions"]'
-    years_experience_option_xpath = f'//li[@role="option" and contains(normalize-space(.), "{matched_experience}")]/div'
-    try:
-        fieldset = WebDriverWait(driver, 20).until(EC.element_to_be_clickable((By.XPATH, years_experience_fieldset_xpath)))
-        driver.execute_script("arguments[0].scrollIntoView(true);", fieldset)
-        time.sleep(1)
-        fieldset.click()
-        print("Waiting for Years of Experience dropdown list to be visible...")
-        dropdown_list = WebDriverWait(driver, 20).until(EC.visibility_of_element_located((By.XPATH, years_experience_dropdown_list_xpath)))
-        print("Dropdown list is visible.")
-        print(f"Searching for option element for '{matched_experience}' using XPath: {years_experience_option_xpath}")
-        option_element = WebDriverWait(driver, 60).until(EC.element_to_be_clickable((By.XPATH, years_experience_option_xpath)))
-        driver.execute_script("arguments[0].scrollIntoView(true);", option_element)
-        time.sleep(1)
-        option_element.click()
-        print(f"Clicked years of experience option: '{matched_experience}'.")
-        time.sleep(2)
-    except Exception as e:
-        print(f"Error applying years of experience filter: {e}")
-    print(f"Filter applied for: '{matched_experience}'.\n")
-
-def scroll_infinite_scroll_data_attribute(driver, scrollable_element=None, pause_time=10, max_attempts=15, initial_wait=5, step_wait=3):
+def resolve_industry(driver, industry):
     """
-    Performs infinite scroll by repeatedly scrolling to elements with 'data-scroll-into-view' attribute.
+    (id, label) of `industry` for the search URL. Known ids come from the
+    persisted `filter_ids`; an unseen industry is included once through the
+    typeahead and its id read back from the URL the UI produces.
     """
-    if scrollable_element:
-        print("Infinite scroll using data-scroll-into-view within specified element...")
-    else:
-        print("Infinite scroll using data-scroll-into-view on document body...")
-
-    print(f"Waiting {initial_wait} seconds before starting data-attribute based infinite scroll...")
-    time.sleep(initial_wait)
-
-    attempts = 0
-    last_lead_count = 0
+    if not industry:
+        return None
+    known = filter_ids.get("INDUSTRY", industry)
+    if known:
+        return known
+    print(f"Industry '{industry}' not seen before, learning its Sales Navigator id...")
+    driver.get(f"{SEARCH_URL}?viewAllFilters=true")
+    close_overlay_if_present(driver)
+    if not apply_industry_filter(driver, industry):
+        return None
+    try:
+        WebDriverWait(driver, WAIT_TIMEOUT).until(lambda d: "INDUSTRY" in unquote(unquote(d.current_url)))
+    except TimeoutException:
+        print(f"Search URL did not pick up the industry filter for '{industry}'.")
+        return None
+    return filter_ids.learn_from_url("INDUSTRY", industry, driver.current_url)
 
-    while attempts < max_attempts:
-        scroll_elements = driver.find_elements(By.CSS_SELECTOR, "[data-scroll-into-view]") # Find all elements with the attribute
-        current_lead_items = driver.find_elements(By.CSS_SELECTOR, "li.artdeco-list__item.pl3.pv3")
-        current_lead_count = len(current_lead_items)
-        print(f"Current lead count: {current_lead_count}")
+SCROLL_UNTIL_COUNT_SCRIPT = """
+const [readySelector, target, idleMs, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const container = document.querySelector('#search-results-container') || document.body;
+const count = () => document.querySelectorAll(readySelector).length;
+let lastCount = -1, finished = false, idleTimer = null, hardTimer = null, observer = null;
 
-        if current_lead_count > last_lead_count:
-            print("New leads loaded.")
-            last_lead_count = current_lead_count
-            attempts = 0  # Reset attempts counter
+function finish(reason) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(idleTimer);
+    clearTimeout(hardTimer);
+    done({count: count(), reason: reason});
+}
 
-            if scroll_elements:
-                last_scroll_element = scroll_elements[-1] # Scroll to the very last element with the data attribute
-                driver.execute_script("arguments[0].scrollIntoView(true);", last_scroll_element)
-                print("Scrolled to the last data-scroll-into-view element.")
-            else:
-                print("No data-scroll-into-view elements found to scroll to.")
+function step() {
+    const current = count();
+    if (current >= target) return finish('target');
+    if (current === lastCount) return;
+    lastCount = current;
+    // Scroll the last lazy-load marker into view so LinkedIn renders the next cards
+    const markers = document.querySelectorAll('[data-scroll-into-view]');
+    if (markers.length) markers[markers.length - 1].scrollIntoView(true);
+    else container.scrollTop = container.scrollHeight;
+    clearTimeout(idleTimer);
+    idleTimer = setTimeout(() => finish('idle'), idleMs);
+}
 
-        else:
-            attempts += 1
-            print(f"No new leads loaded, attempt {attempts}/{max_attempts}...")
-            if attempts >= max_attempts:
-                print("Stopping infinite scroll: Max attempts reached without new leads.")
-                break
+observer = new MutationObserver(step);
+observer.observe(container, {childList: true, subtree: true});
+hardTimer = setTimeout(() => finish('timeout'), timeoutMs);
+step();
+"""
 
-        time.sleep(step_wait)
 
-    print("Infinite scroll using data-scroll-into-view completed.")
+def scroll_until_count(driver, target, idle_timeout=4, max_wait=60):
+    """
+    Scrolls the results list until `target` lead cards are rendered, no new
+    card appeared for `idle_timeout` seconds (end of the page) or `max_wait`
+    passes. A MutationObserver in the page resolves as soon as cards arrive,
+    so there is no fixed sleep between scroll steps.
+    """
+    driver.set_script_timeout(max_wait + 5)
+    result = driver.execute_async_script(SCROLL_UNTIL_COUNT_SCRIPT, LEAD_CARD_READY_SELECTOR, target, idle_timeout * 1000, max_wait * 1000)
+    print(f"Scrolling stopped ({result['reason']}) with {result['count']} lead cards loaded (target {target}).")
+    return result["count"]
 
-def scrape_leads(driver):
+def scrape_leads(driver, capture=None, target=PAGE_SIZE):
     print("Identifying search results container for scrolling...")
-    search_results_container = WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.ID, "search-results-container")))
+    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.ID, "search-results-container")))
     print("Search results container found.")
-    scroll_infinite_scroll_data_attribute(driver, scrollable_element=search_results_container, pause_time=10, max_attempts=15, initial_wait=5, step_wait=3)
-    print("Waiting for lead items to be present after scrolling...")
-    WebDriverWait(driver, 30).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "li.artdeco-list__item.pl3.pv3")))
-    print("Lead items found after scrolling.")
+    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.CSS_SELECTOR, LEAD_CARD_SELECTOR)))
+    scroll_until_count(driver, target)
+    if capture:
+        leads_data = parse_search_leads(capture.responses(SEARCH_PATTERN))
+        if leads_data:
+            print(f"Extracted {len(leads_data)} leads from captured search responses.")
+            return leads_data[:target]
+        print("No search responses captured, falling back to DOM extraction.")
     print("Finished scrolling. Now scraping leads...")
     leads_data = []
     try:
-        lead_items = driver.find_elements(By.CSS_SELECTOR, "li.artdeco-list__item.pl3.pv3")
-        print(f"Found {len(lead_items)} lead items on the page.")
-        for index, item in enumerate(lead_items):
-            name = "NA"
-            title = "NA"
-            profile_link = "NA"
-            location = "NA"
-            company = "NA"
-            company_link = "NA"
-            for retry in range(MAX_RETRIES):
-                try:
-                    name_element = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "span[data-anonymize='person-name']")))
-                    name = name_element.text.strip()
-                    break
-                except Exception as e:
-                    print(f"Lead {index+1}: Name extraction attempt {retry+1} failed: {e}")
-                    if retry == MAX_RETRIES - 1:
-                        print(f"Lead {index+1}: Max retries for name reached, using fallback.")
-                        try:
-                            headshot_anchor = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[data-anonymize='headshot-photo']")))
-                            img = headshot_anchor.find_element(By.TAG_NAME, "img")
-                            alt_text = img.get_attribute("alt")
-                            if alt_text:
-                                name = alt_text.strip().replace("Go to ", "").replace("’s profile", "")
-                        except Exception as fallback_e:
-                            print(f"Lead {index+1}: Fallback name extraction failed: {fallback_e}")
-                            name = "NA"
-            for retry in range(MAX_RETRIES):
-                try:
-                    title_element = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.artdeco-entity-lockup__subtitle span[data-anonymize='title']")))
-                    title = title_element.text.strip()
-                    break
-                except Exception as e:
-                    print(f"Lead {index+1}: Title extraction attempt {retry+1} failed: {e}")
-                    if retry == MAX_RETRIES - 1:
-                        print(f"Lead {index+1}: Max retries for title reached, using NA.")
-                        title = "NA"
-            for retry in range(MAX_RETRIES):
-                try:
-                    profile_anchor = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.artdeco-entity-lockup__title a.ember-view")))
-                    profile_link = profile_anchor.get_attribute("href")
-                    break
-                except Exception as e:
-                    print(f"Lead {index+1}: Profile link extraction attempt {retry+1} failed: {e}")
-                    if retry == MAX_RETRIES - 1:
-                        print(f"Lead {index+1}: Max retries for profile link reached, using fallback.")
-                        try:
-                            headshot_anchor = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[data-anonymize='headshot-photo']")))
-                            href = headshot_anchor.get_attribute("href")
-                            if href:
-                                profile_link = "https://www.linkedin.com" + href if href.startswith("/") else href
-                            else:
-                                profile_link = "NA"
-                        except Exception as fallback_e:
-                            print(f"Lead {index+1}: Fallback profile link extraction failed: {fallback_e}")
-                            profile_link = "NA"
-            for retry in range(MAX_RETRIES):
-                try:
-                    company_element = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.artdeco-entity-lockup__subtitle a")))
-                    company = company_element.text.strip()
-                    break
-                except Exception as e:
-                    print(f"Lead {index+1}: Company extraction attempt {retry+1} (using <a> tag) failed: {e}")
-                    if retry == MAX_RETRIES - 1:
-                        print(f"Lead {index+1}: Fallback sequence for company...")
-                        try:
-                            company_element_fallback_text = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.XPATH, ".//div[@class='artdeco-entity-lockup__subtitle']//span[@class='separator--middot']/following-sibling::text()[1]")))
-                            company = company_element_fallback_text.get_attribute('textContent').strip().replace('See more about', '').strip()
-                            break
-                        except:
-                            print(f"Lead {index+1}: Fallback company extraction (text after separator) failed.")
-                            try:
-                                company_element_fallback_button = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.XPATH, ".//div[@class='artdeco-entity-lockup__subtitle']//button[@class='entity-hovercard__a11y-trigger']")))
-                                company = company_element_fallback_button.get_attribute('aria-label').replace('See more about ', '').strip()
-                                break
-                            except Exception as final_fallback_e:
-                                print(f"Lead {index+1}: Fallback company extraction (button aria-label) failed: {final_fallback_e}")
-                                company = "NA"
-                        if company != "NA":
-                            break
-                    continue
-            for retry in range(MAX_RETRIES):
-                try:
-                    location_element = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "span[data-anonymize='location']")))
-                    location = location_element.text.strip()
-                    break
-                except Exception as e:
-                    print(f"Lead {index+1}: Location extraction attempt {retry+1} failed: {e}")
-                    if retry == MAX_RETRIES - 1:
-                        print(f"Lead {index+1}: Max retries for location reached, using NA.")
-                        location = "NA"
-            for retry in range(MAX_RETRIES):
-                try:
-                    company_link_element = WebDriverWait(item, SHORT_TIMEOUT).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a[data-anonymize='company-name']")))
-                    company_link = company_link_element.get_attribute("href")
-                    if company_link.startswith("/"):
-                        company_link = "https://www.linkedin.com" + company_link
-                    break
-                except Exception as e:
-                    print(f"Lead {index+1}: Company link extraction attempt {retry+1} failed: {e}")
-                    if retry == MAX_RETRIES - 1:
-                        print(f"Lead {index+1}: Max retries reached, using fallback.")
-                        company_link = "NA"
-            lead = {"Name": name, "Title": title, "Profile Link": profile_link, "Location": location, "Company": company, "Company Link": company_link}
+        # One execute_script call extracts every field of every card
+        leads_data = selector_registry.extract_records(driver, "lead_card", root_selector=LEAD_CARD_SELECTOR, default="NA")[:target]
+        print(f"Found {len(leads_data)} lead items on the page.")
+        for index, lead in enumerate(leads_data):
+            for link_field in ("Profile Link", "Company Link"):
+                if lead[link_field].startswith("/"):
+                    lead[link_field] = "https://www.linkedin.com" + lead[link_field]
             print(f"Lead {index+1} extracted: {lead}")
-            leads_data.append(lead)
         print("Leads scraping completed.")
         return leads_data
     except Exception as e:
         print(f"Error scraping leads: {e}")
         return leads_data
 
+def go_to_next_page(driver):
+    """Clicks the results "Next" button. Returns False on the last page."""
+    try:
+        next_button = driver.find_element(By.CSS_SELECTOR, "button.artdeco-pagination__button--next")
+    except NoSuchElementException:
+        print("Next button not found, assuming last page")
+        return False
+    if not next_button.is_enabled():
+        print("Next button is not enabled, assuming last page")
+        return False
+    first_card = driver.find_element(By.CSS_SELECTOR, LEAD_CARD_SELECTOR)
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
+    next_button.click()
+    # The old cards are detached once the next page has rendered
+    WebDriverWait(driver, WAIT_TIMEOUT).until(EC.staleness_of(first_card))
+    return True
+
+def harvest_leads(driver, target, capture=None, events=None):
+    """
+    Walks the search result pages and yields lead records as each page is
+    extracted, stopping as soon as `target` leads were yielded or the last
+    page is reached. Only one page of records is held in memory at a time.
+    """
+    harvested = 0
+    seen = set()
+    page_number = 1
+    while harvested < target:
+        print(f"Harvesting result page {page_number} ({harvested}/{target} leads so far)...")
+        page_leads = scrape_leads(driver, capture=capture, target=min(target - harvested, PAGE_SIZE))
+        if events:
+            events.emit(PAGE_SCRAPED, page=page_number, leads=len(page_leads))
+        if not page_leads:
+            print(f"No leads found on page {page_number}, stopping.")
+            return
+        for lead in page_leads:
+            # Pages can overlap when LinkedIn re-ranks results between requests;
+            # the raw links differ per request, the member id does not
+            key = member_id(lead["Profile Link"]) or lead["Profile Link"]
+            if key in seen:
+                continue
+            seen.add(key)
+            harvested += 1
+            yield lead
+            if harvested >= target:
+                break
+        if harvested >= target or not go_to_next_page(driver):
+            break
+        page_number += 1
+    print(f"Harvested {harvested} leads from {page_number} page(s).")
+
 def save_leads_to_csv(leads, filename="leads_output.csv"):
     try:
         df = pd.DataFrame(leads)
@@ -331,50 +261,100 @@ def save_leads_to_csv(leads, filename="leads_output.csv"):
     except Exception as e:
         print(f"Error saving leads data to CSV: {e}")
 
-def iterasi_csv(session_id, driver):
-    # Process all profiles at once by calling scrape_contact_info a single time.
-    scrape_contact_info(session_id, driver)
-    # Now, read the enriched CSV and return its records.
-    try:
-        enriched_df = pd.read_csv('scrape_output2.csv')
-        return enriched_df.to_dict(orient='records')
-    except Exception as e:
-        logging.error(f"Error reading enriched CSV: {e}")
-        return None
-    
-
-def main_scrape_leads(session_id, driver, industry, job_title, seniority_level, years_of_experience, debug=False):
+def main_scrape_leads(session_id, driver, industry, job_title, seniority_level, years_of_experience, debug=False, resume=False, number_of_leads=PAGE_SIZE, enrich_drivers=(), shard_drivers=(), plan=None):
+    """
+    Searches and enriches leads through the streaming `LeadPipeline`.
+    `driver` runs the search; optional `enrich_drivers` (contact, company)
+    let enrichment run concurrently with the harvester, and `shard_drivers`
+    harvest slices of a large search alongside it (see `sharded_search`).
+    A `query_planner.QueryPlan` adds its pushed-down filters to the search
+    and rejects cards that can't qualify before they are enriched.
+    """
     with open("config.json", "r") as config_file:
         config = json.load(config_file)
+
+    functions = plan.functions if plan else None
+    company_headcount = plan.company_headcount if plan else None
+    cards_wanted = plan.search_target(number_of_leads) if plan else number_of_leads
+
+    def search(harvest_driver, capture, events):
+        if not shard_drivers and cards_wanted <= SEARCH_RESULT_CAP:
+            return search_leads(harvest_driver, industry, job_title, seniority_level, years_of_experience, capture=capture, number_of_leads=cards_wanted, events=events, company_headcount=company_headcount, functions=functions)
+        return sharded_search((harvest_driver, *shard_drivers), industry, job_title, seniority_level, years_of_experience, number_of_leads=cards_wanted, capture_for=pipeline.capture_for, events=events, company_headcount=company_headcount, functions=functions)
+
+    pipeline = LeadPipeline(session_id, job_title, driver, *enrich_drivers, resume=resume, plan=plan, target=number_of_leads)
+    records = pipeline.run(search)
+    if records:
+        save_results(session_id, records)
+    else:
+        print("No leads found to save.")
+    return records
+
+
+def search_leads(driver, industry, job_title, seniority_level, years_of_experience, capture=None, number_of_leads=PAGE_SIZE, events=None, company_headcount=None, functions=None):
+    """Opens the search with every filter encoded in the URL, then yields lead cards page by page (see `harvest_leads`)."""
+    open_search(driver, industry, job_title, seniority_level, years_of_experience, capture=capture, events=events, company_headcount=company_headcount, functions=functions)
+    yield from harvest_leads(driver, number_of_leads, capture=capture, events=events)
+
+
+def open_search(driver, industry, job_title, seniority_level, years_of_experience, capture=None, events=None, company_headcount=None, functions=None):
+    """Navigates to the first result page of the search with every filter encoded in the URL."""
+    industry_filter = resolve_industry(driver, industry)
+    if industry and not industry_filter:
+        print(f"Could not resolve industry '{industry}', searching without the industry filter.")
+    search_url = build_search_url(job_title=job_title, seniority_levels=seniority_level, years_of_experience=years_of_experience, industry=industry_filter, functions=functions, company_headcount=company_headcount)
+    if capture:
+        capture.reset()  # drop responses of earlier navigations (industry lookup, a previous shard)
     try:
-        driver.get('https://www.linkedin.com/sales/search/people?viewAllFilters=true')
+        driver.get(search_url)
         close_overlay_if_present(driver)
-        print("Successfully navigated to LinkedIn Sales Navigator search page.")
+        print(f"Opened filtered Sales Navigator search: {search_url}")
     except Exception as e:
-        print(f"Error navigating to URL after login: {e}")
+        print(f"Error navigating to search URL: {e}")
+    if events:
+        events.emit(FILTERS_APPLIED, url=search_url, jobTitle=job_title, seniority=seniority_level, yearsOfExperience=years_of_experience, industry=industry_filter[1] if industry_filter else None, functions=functions, companyHeadcount=company_headcount)
 
-    job_title_value = job_title
-    seniority_value = seniority_level
-    industry_value = industry
-    experience_value = years_of_experience
-    matched_seniority = get_closest_match(seniority_value, StaticValue().SENIORITY_LEVEL.values())
-    matched_experience = get_closest_match(experience_value, StaticValue().YEARS_OF_EXPERIENCE.values(), score_cutoff=60)
 
-    apply_job_title_filter(driver, job_title_value)
-    apply_seniority_filter(driver, matched_seniority)
-    apply_years_experience_filter(driver, matched_experience)
-    apply_industry_filter(driver, industry_value)
+RESULT_COUNT_XPATH = "//span[contains(normalize-space(.), ' result')]"
 
-    leads = scrape_leads(driver)
-    print("Scraped Leads Data:")
-    for lead in leads:
-        print(lead)
-    save_leads_to_csv(leads, filename=f"{session_id}.csv")
+def read_result_count(driver):
+    """Total results of the open search from its "1,234 results" / "1K+ results" header; None if not shown."""
+    try:
+        labels = WebDriverWait(driver, SHORT_TIMEOUT).until(EC.presence_of_all_elements_located((By.XPATH, RESULT_COUNT_XPATH)))
+    except TimeoutException:
+        return None
+    for label in labels:
+        match = re.search(r"([\d.,]+)\s*([KM])?\+?\s+results?", label.text)
+        if match:
+            number = float(match.group(1).replace(",", ""))
+            return int(number * {"K": 1_000, "M": 1_000_000}.get(match.group(2), 1))
+    return None
 
-    leads_pro_data = iterasi_csv(session_id, driver)
-    if leads_pro_data:
-        save_leads_to_csv(leads_pro_data, filename=f"{session_id}_leads_pro.csv")
-    else:
-        print("No enriched leads data to save.")
+def sharded_search(drivers, industry, job_title, seniority_level, years_of_experience, number_of_leads=PAGE_SIZE, capture_for=lambda driver: None, events=None, company_headcount=None, functions=None):
+    """
+    Opens the full search and reads its total result count, splits it into
+    shards (see `plan_shards`) and harvests them in parallel, one browser
+    each, yielding the merged and de-duplicated lead cards. When the search
+    stays one shard, the page already open is harvested as is.
+    """
+    driver = drivers[0]
+    capture = capture_for(driver)
+    # Also learns the industry id, the shards read it from `filter_ids`
+    open_search(driver, industry, job_title, seniority_level, years_of_experience, capture=capture, events=events, company_headcount=company_headcount, functions=functions)
+    try:
+        total = read_result_count(driver)
+    except Exception as e:
+        print(f"Could not read the total result count: {e}")
+        total = None
+    shards = plan_shards(seniority_level, total, number_of_leads, len(drivers), company_headcount=company_headcount)
+    print(f"Search has {total if total is not None else 'an unknown number of'} results, harvesting {number_of_leads} in {len(shards)} shard(s) on {len(drivers)} browser(s).")
+    if events:
+        events.emit(SHARDS_PLANNED, total=total, shards=[str(shard) for shard in shards], browsers=len(drivers))
+
+    def search(shard_driver, shard, target):
+        return search_leads(shard_driver, industry, job_title, shard.seniority_levels, years_of_experience, capture=capture_for(shard_driver), number_of_leads=target, events=events, company_headcount=shard.company_headcount or company_headcount, functions=functions)
 
-    company_info(driver, session_id)
+    if len(shards) == 1:
+        yield from harvest_leads(driver, number_of_leads, capture=capture, events=events)
+        return
+    yield from run_shards(shards, list(drivers), search, number_of_leads)
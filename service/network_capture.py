@@ -0,0 +1,119 @@
+import os
+import re
+import json
+import logging
+from selenium import webdriver
+from dotenv import load_dotenv
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# "dom" scrapes rendered HTML, "network" parses the Sales Navigator API responses
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "dom").lower()
+
+SEARCH_PATTERN = re.compile(r"/sales-api/salesApiLeadSearch")
+PROFILE_PATTERN = re.compile(r"/sales-api/salesApiProfiles/")
+COMPANY_PATTERN = re.compile(r"/sales-api/salesApiCompanies/")
+
+LEAD_URN_PATTERN = re.compile(r"\(([^,]+),([^,]+),([^)]+)\)")
+COMPANY_URN_PATTERN = re.compile(r"urn:li:fs_salesCompany:(\d+)")
+
+
+def network_capture_enabled() -> bool:
+    return EXTRACTION_MODE == "network"
+
+
+class NetworkCapture:
+    """
+    Reads JSON API responses a page fetched, through the Chrome DevTools Protocol.
+    Needs a driver started with the "performance" log enabled (see build_chrome_options).
+    """
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+
+    def enable(self):
+        self.driver.execute_cdp_cmd("Network.enable", {
+            "maxTotalBufferSize": 50 * 1024 * 1024,
+            "maxResourceBufferSize": 10 * 1024 * 1024,
+        })
+
+    def reset(self):
+        """Drop everything logged so far, e.g. responses of a previous page or job."""
+        self.driver.get_log("performance")
+
+    def responses(self, pattern: re.Pattern) -> list:
+        """Parsed JSON bodies of the responses received since the last call whose URL matches `pattern`."""
+        bodies = []
+        for entry in self.driver.get_log("performance"):
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            if message.get("method") != "Network.responseReceived":
+                continue
+            response = message["params"]["response"]
+            if not pattern.search(response.get("url", "")) or "json" not in response.get("mimeType", ""):
+                continue
+            try:
+                result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": message["params"]["requestId"]})
+                bodies.append(json.loads(result["body"]))
+            except Exception as e:
+                logging.warning(f"Could not read response body for {response.get('url')}: {e}")
+        return bodies
+
+
+def parse_search_leads(bodies: list) -> list:
+    """Lead records (same keys as nav4.scrape_leads) from salesApiLeadSearch responses."""
+    leads = []
+    for body in bodies:
+        for element in body.get("elements", []):
+            profile_link = "NA"
+            match = LEAD_URN_PATTERN.search(element.get("entityUrn", ""))
+            if match:
+                profile_link = f"https://www.linkedin.com/sales/lead/{match.group(1)},{match.group(2)},{match.group(3)}"
+            positions = element.get("currentPositions") or [{}]
+            position = positions[0]
+            company_link = "NA"
+            company_match = COMPANY_URN_PATTERN.search(position.get("companyUrn", "") or "")
+            if company_match:
+                company_link = f"https://www.linkedin.com/sales/company/{company_match.group(1)}"
+            leads.append({
+                "Name": element.get("fullName") or "NA",
+                "Title": position.get("title") or "NA",
+                "Profile Link": profile_link,
+                "Location": element.get("geoRegion") or "NA",
+                "Company": position.get("companyName") or "NA",
+                "Company Link": company_link,
+            })
+    return leads
+
+
+def _join(values: list) -> str:
+    values = [str(value).strip() for value in values if value]
+    return " " + "; ".join(values) + ";" if values else "NULL"
+
+
+def parse_lead_contact(body: dict) -> dict:
+    """Contact record (same keys as info_service.scrape_lead_contact) from a salesApiProfiles response."""
+    contact = body.get("contactInfo") or {}
+    return {
+        "About": body.get("summary") or "NULL",
+        "Linkedin URL": body.get("flagshipProfileUrl") or "NULL",
+        "Phone(s)": _join([phone.get("number") for phone in contact.get("phoneNumbers", [])]),
+        "Email(s)": _join([email.get("emailAddress") for email in contact.get("emailAddresses", [])] or [contact.get("primaryEmail")]),
+        "Website(s)": _join([website.get("url") for website in contact.get("websites", [])]),
+        "Social(s)": _join([social.get("name") for social in contact.get("socialHandles", [])]),
+        "Address(s)": _join([address.get("address") if isinstance(address, dict) else address for address in contact.get("addresses", [])]),
+    }
+
+
+def parse_company(body: dict) -> dict:
+    """Company record (same keys as company_service.scrape_company) from a salesApiCompanies response."""
+    headquarters = body.get("headquarters") or {}
+    hq_parts = [headquarters.get(part) for part in ("city", "geographicArea", "country") if headquarters.get(part)]
+    return {
+        "Company Overview": body.get("description") or "NULL",
+        "Company Headquarters": ", ".join(hq_parts) if hq_parts else (body.get("location") or "NULL"),
+        "Company Website": body.get("website") or "NULL",
+    }
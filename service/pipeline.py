@@ -0,0 +1,320 @@
+import queue
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, List, Optional
+import pandas as pd
+from fuzzywuzzy import fuzz
+from selenium import webdriver
+from service.job_journal import JobJournal
+from service.result_writer import result_writer
+from service.job_events import JobEvents, JOB_STARTED, LEAD_FOUND, LEAD_ENRICHED, JOB_FINISHED, JOB_FAILED
+from service.artifact_store import ArtifactStore, SEARCH_CARDS, LEADS_PRO, LEADS_PRO_COMPANY_INFO
+from service.info_service import CONTACT_FIELDS
+from service.lead_cache import get_lead_contact, lead_cache
+from service.company_service import COMPANY_PANEL_FIELDS
+from service.company_cache import get_company, company_cache
+from service.network_capture import NetworkCapture, network_capture_enabled
+from utils.linkedin_url import member_id, company_id
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+QUEUE_SIZE = 10  # records buffered between two stages
+_DONE = object()
+_HARVEST_COMPLETE = "__complete__"
+
+
+@dataclass
+class LeadCard:
+    """One search result card, as harvested from the results page."""
+    index: int
+    name: str
+    title: str
+    profile_link: str
+    location: str
+    company: str
+    company_link: str
+    member_id: Optional[str] = None
+    company_id: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, index: int, lead: dict) -> "LeadCard":
+        return cls(
+            index=index,
+            name=lead["Name"],
+            title=lead["Title"],
+            profile_link=lead["Profile Link"],
+            location=lead["Location"],
+            company=lead["Company"],
+            company_link=lead["Company Link"],
+            member_id=member_id(lead["Profile Link"]),
+            company_id=company_id(lead["Company Link"]),
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "Name": self.name,
+            "Title": self.title,
+            "Profile Link": self.profile_link,
+            "Location": self.location,
+            "Company": self.company,
+            "Company Link": self.company_link,
+        }
+
+
+@dataclass
+class LeadRecord:
+    """A lead travelling through the pipeline; each stage fills in its part."""
+    card: LeadCard
+    contact: dict = field(default_factory=lambda: {name: "NULL" for name in CONTACT_FIELDS})
+    company: dict = field(default_factory=lambda: {name: "NULL" for name in COMPANY_PANEL_FIELDS})
+    relevance_score: Optional[int] = None
+
+    def to_row(self) -> dict:
+        """Row in the column order of the `leads_pro_company_info.csv` artifact."""
+        return {
+            "Name": self.card.name,
+            "Role": self.card.title,
+            **self.contact,
+            "Geography": self.card.location,
+            "Company": self.card.company,
+            "Company Link": self.card.company_link,
+            **self.company,
+            "Relevance Score": self.relevance_score,
+        }
+
+
+class Stage:
+    """A pipeline step. `driver` is the browser it navigates, None for pure-Python steps."""
+
+    def __init__(self, name: str, fn: Callable[[LeadRecord], LeadRecord], driver: Optional[webdriver.Chrome] = None):
+        self.name = name
+        self.fn = fn
+        self.driver = driver
+
+
+class LeadPipeline:
+    """
+    Streams leads from the search harvester through contact enrichment,
+    company enrichment and scoring. Stages are connected by bounded queues,
+    so with a separate browser per stage contact enrichment of the first lead
+    starts while the harvester is still paging; stages that share a browser
+    are fused into one thread and run one after another for each lead.
+    Results stay in memory and the CSV exports are written once at the end.
+    """
+
+    def __init__(self, session_id: str, job_title: str, harvest_driver: webdriver.Chrome,
+                 contact_driver: webdriver.Chrome = None, company_driver: webdriver.Chrome = None,
+                 resume: bool = False, queue_size: int = QUEUE_SIZE, plan=None, target: Optional[int] = None):
+        self.session_id = session_id
+        self.job_title = job_title
+        self.harvest_driver = harvest_driver
+        self.contact_driver = contact_driver or harvest_driver
+        self.company_driver = company_driver or self.contact_driver
+        self.resume = resume
+        self.queue_size = queue_size
+        self.plan = plan  # `query_planner.QueryPlan`, rejects cards that can't qualify before enrichment
+        self.target = target  # leads to keep, when the search is asked for more cards than that
+        self.events = JobEvents(session_id)
+        self.captures = {}
+        self._errors = []
+
+        self.harvest_journal = JobJournal(session_id, "search_cards")
+        self.contact_journal = JobJournal(session_id, "contact_info")
+        self.company_journal = JobJournal(session_id, "company_info")
+        if not resume:
+            for journal in (self.harvest_journal, self.contact_journal, self.company_journal):
+                journal.clear()
+        self.contact_committed = self.contact_journal.load()
+        self.company_committed = self.company_journal.load()
+        company_cache.evict()
+        lead_cache.evict()
+
+    def capture_for(self, driver: webdriver.Chrome) -> Optional[NetworkCapture]:
+        """One network capture per browser, so concurrent stages don't read each other's responses."""
+        if not network_capture_enabled():
+            return None
+        if id(driver) not in self.captures:
+            capture = NetworkCapture(driver)
+            capture.reset()
+            self.captures[id(driver)] = capture
+        return self.captures[id(driver)]
+
+    # --- stages -------------------------------------------------------------
+
+    def harvest(self, search: Callable[[webdriver.Chrome, Optional[NetworkCapture], JobEvents], Iterable[dict]]) -> Iterable[LeadRecord]:
+        """Lead cards from `search`, or replayed from the journal of a previous attempt that finished harvesting."""
+        committed = self.harvest_journal.load()
+        if self.resume and _HARVEST_COMPLETE in committed:
+            logging.info(f"Resuming {self.session_id}: search results already harvested, skipping filters and lead scraping.")
+            cards = sorted((card for key, card in committed.items() if key != _HARVEST_COMPLETE), key=lambda card: card["index"])
+            for card in cards:
+                yield LeadRecord(LeadCard(**card))
+            return
+
+        self.harvest_journal.clear()
+        cards = search(self.harvest_driver, self.capture_for(self.harvest_driver), self.events)
+        index = 0
+        try:
+            for lead in cards:
+                card = LeadCard.from_dict(index, lead)
+                reason = self.plan.check_card(card) if self.plan else None
+                if reason:
+                    logging.info(f"Skipping {card.name} before enrichment: {reason}")
+                    continue
+                self.harvest_journal.append(str(index), card.__dict__)
+                self.events.emit(LEAD_FOUND, index=index, lead=card.to_dict())
+                yield LeadRecord(card)
+                index += 1
+                if self.target is not None and index >= self.target:
+                    break
+        finally:
+            if hasattr(cards, "close"):
+                cards.close()  # stops the search (and any shard browsers) early
+        self.harvest_journal.append(_HARVEST_COMPLETE, {})
+        if self.plan:
+            logging.info(f"Card check for {self.session_id}: {self.plan.savings()}")
+
+    def enrich_contact(self, record: LeadRecord) -> LeadRecord:
+        # Profile links carry a per-search token, so a resumed search only matches on the member id
+        key = record.card.member_id or record.card.profile_link
+        if key in self.contact_committed:
+            record.contact = self.contact_committed[key]
+            return record
+        record.contact = get_lead_contact(self.contact_driver, record.card.profile_link, capture=self.capture_for(self.contact_driver))
+        self.contact_journal.append(key, record.contact)
+        return record
+
+    def enrich_company(self, record: LeadRecord) -> LeadRecord:
+        company_link = record.card.company_link
+        if not company_link or company_link == "NA":
+            return record
+        key = record.card.company_id or company_link
+        if key in self.company_committed:
+            record.company = self.company_committed[key]
+        else:
+            logging.info(f"Getting company {record.card.index + 1} data from: {company_link}")
+            record.company = get_company(self.company_driver, company_link, capture=self.capture_for(self.company_driver))
+            self.company_journal.append(key, record.company)
+        if record.card.company_id:
+            result_writer.add_company(record.card.company_id, record.card.company, company_link, record.company)
+        return record
+
+    def score(self, record: LeadRecord) -> LeadRecord:
+        """How closely the lead's title matches the requested job title, 0-100."""
+        record.relevance_score = fuzz.token_set_ratio(self.job_title or "", record.card.title or "")
+        return record
+
+    # --- runner -------------------------------------------------------------
+
+    def run(self, search) -> List[LeadRecord]:
+        self.events.emit(JOB_STARTED, resume=self.resume, plan=self.plan.report()["predicates"] if self.plan else None)
+        try:
+            results = self._run(search)
+        except Exception as e:
+            self.events.emit(JOB_FAILED, error=str(e))
+            raise
+        self.events.emit(JOB_FINISHED, leads=len(results), cardCheck=self.plan.savings() if self.plan else None)
+        return results
+
+    def _run(self, search) -> List[LeadRecord]:
+        stages = [
+            Stage("contact", self.enrich_contact, self.contact_driver),
+            Stage("company", self.enrich_company, self.company_driver),
+            Stage("score", self.score),
+        ]
+        source = self.harvest(search)
+        if self.contact_driver is self.harvest_driver:
+            # The harvester needs its results page until the last card, so
+            # drain it before the same browser is navigated to profiles.
+            source = list(source)
+            logging.info(f"Harvested {len(source)} leads, enriching on the same browser.")
+
+        # Fuse consecutive stages that share a browser (or need none) into one segment
+        segments = []
+        for stage in stages:
+            if segments and (stage.driver is None or stage.driver is segments[-1][-1].driver):
+                segments[-1].append(stage)
+            else:
+                segments.append([stage])
+
+        threads = []
+        inbox = self._feed(source, threads)
+        for segment in segments:
+            inbox = self._start_segment(segment, inbox, threads)
+
+        results = []
+        while True:
+            record = inbox.get()
+            if record is _DONE:
+                break
+            results.append(record)
+            result_writer.add_lead(self.session_id, record)
+            self.events.emit(LEAD_ENRICHED, index=record.card.index, lead=record.to_row())
+            logging.info(f"Lead {record.card.index + 1} done: {record.card.name} (score {record.relevance_score})")
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+        result_writer.flush()
+        results.sort(key=lambda record: record.card.index)
+        return results
+
+    def _feed(self, source, threads) -> queue.Queue:
+        outbox = queue.Queue(maxsize=self.queue_size)
+
+        def feed():
+            try:
+                for record in source:
+                    if self._errors:
+                        break  # a downstream stage failed, stop harvesting
+                    outbox.put(record)
+            except Exception as e:
+                logging.error(f"Pipeline stage harvest failed for {self.session_id}: {e}")
+                self._errors.append(e)
+            finally:
+                outbox.put(_DONE)
+
+        thread = threading.Thread(target=feed, name=f"pipeline-harvest-{self.session_id}", daemon=True)
+        thread.start()
+        threads.append(thread)
+        return outbox
+
+    def _start_segment(self, segment: List[Stage], inbox: queue.Queue, threads) -> queue.Queue:
+        outbox = queue.Queue(maxsize=self.queue_size)
+        name = "+".join(stage.name for stage in segment)
+
+        def work():
+            try:
+                while True:
+                    record = inbox.get()
+                    if record is _DONE:
+                        break
+                    if self._errors:
+                        continue  # keep draining so upstream never blocks on a full queue
+                    for stage in segment:
+                        record = stage.fn(record)
+                    outbox.put(record)
+            except Exception as e:
+                logging.error(f"Pipeline stage {name} failed for {self.session_id}: {e}")
+                self._errors.append(e)
+                while inbox.get() is not _DONE:
+                    pass
+            finally:
+                outbox.put(_DONE)
+
+        thread = threading.Thread(target=work, name=f"pipeline-{name}-{self.session_id}", daemon=True)
+        thread.start()
+        threads.append(thread)
+        return outbox
+
+
+def save_results(session_id: str, records: List[LeadRecord]):
+    """Writes the search, contact and company exports to the job's artifact store in one go."""
+    store = ArtifactStore(session_id)
+    store.write_csv(SEARCH_CARDS, pd.DataFrame([record.card.to_dict() for record in records], columns=["Name", "Title", "Profile Link", "Location", "Company", "Company Link"]))
+    rows = [record.to_row() for record in records]
+    contact_columns = ["Name", "Role", *CONTACT_FIELDS, "Geography", "Company", "Company Link"]
+    store.write_csv(LEADS_PRO, pd.DataFrame(rows, columns=contact_columns))
+    full_columns = [*contact_columns, *COMPANY_PANEL_FIELDS, "Relevance Score"]
+    store.write_csv(LEADS_PRO_COMPANY_INFO, pd.DataFrame(rows, columns=full_columns))
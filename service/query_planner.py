@@ -0,0 +1,162 @@
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional
+from fuzzywuzzy import fuzz
+from service.search_query import FUNCTION_IDS, COMPANY_HEADCOUNT_IDS, closest_choice, seniority_filter_ids, years_at_company_id
+from service.shard_planner import SEARCH_RESULT_CAP
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Opt-in: the title is already a CURRENT_TITLE filter, and a fuzzy score would drop synonym titles
+TITLE_MIN_SCORE = int(os.getenv("TITLE_MIN_SCORE", "0"))
+FUNCTION_MIN_SCORE = 70
+CARD_OVERFETCH = int(os.getenv("CARD_OVERFETCH", "3"))  # cards harvested per requested lead at most, to make up for rejected ones
+ENRICH_VISITS_PER_LEAD = 2  # lead profile + company page
+ENRICH_SECONDS_PER_VISIT = float(os.getenv("ENRICH_SECONDS_PER_VISIT", "6"))
+
+PUSHDOWN = "pushdown"  # Sales Navigator filter, applied before any card is loaded
+LOCAL = "local"        # checked on the search card, before enrichment
+DEFERRED = "deferred"  # needs enriched data, left to scoring
+DROPPED = "dropped"    # can't be applied, logged
+
+
+@dataclass
+class Predicate:
+    criterion: str
+    value: object
+    placement: str
+    reason: str = ""
+
+    def to_dict(self) -> dict:
+        return {"criterion": self.criterion, "value": self.value, "placement": self.placement, "reason": self.reason}
+
+
+@dataclass
+class QueryPlan:
+    """
+    Where each search criterion is evaluated. Pushed-down criteria become
+    search URL filters (see `search_query.build_search_url`); local ones
+    reject search cards before the expensive profile and company visits.
+    """
+    job_title: str
+    seniority_levels: List[str]
+    years_of_experience: object
+    industry: Optional[str]
+    functions: List[str] = field(default_factory=list)
+    company_headcount: List[str] = field(default_factory=list)
+    local_functions: List[str] = field(default_factory=list)
+    title_min_score: int = TITLE_MIN_SCORE
+    predicates: List[Predicate] = field(default_factory=list)
+    cards_seen: int = 0
+    cards_rejected: int = 0
+
+    @property
+    def filters_cards(self) -> bool:
+        return bool(self.title_min_score and self.job_title) or bool(self.local_functions)
+
+    def search_target(self, number_of_leads: int) -> int:
+        """
+        Cards to harvest for `number_of_leads` leads, leaving room for the ones
+        the card check rejects. The room stops at the result cap of one query,
+        so over-fetching alone never forces a sharded search.
+        """
+        if not self.filters_cards:
+            return number_of_leads
+        return max(number_of_leads, min(number_of_leads * CARD_OVERFETCH, SEARCH_RESULT_CAP))
+
+    def check_card(self, card) -> Optional[str]:
+        """Why `card` (a `pipeline.LeadCard`) can't qualify, or None if it should be enriched."""
+        self.cards_seen += 1
+        title = card.title if card.title not in ("NA", "NULL") else ""
+        if not title:
+            # Nothing to check on this card, enrichment decides
+            return None
+        reason = None
+        if self.title_min_score and self.job_title:
+            score = fuzz.token_set_ratio(self.job_title, title)
+            if score < self.title_min_score:
+                reason = f"title '{title}' scores {score} against '{self.job_title}'"
+        if reason is None and self.local_functions:
+            if not any(fuzz.partial_ratio(function.lower(), title.lower()) >= FUNCTION_MIN_SCORE for function in self.local_functions):
+                reason = f"title '{title}' matches none of {', '.join(self.local_functions)}"
+        if reason:
+            self.cards_rejected += 1
+        return reason
+
+    def savings(self) -> dict:
+        """Enrichment avoided by the card check so far."""
+        visits = self.cards_rejected * ENRICH_VISITS_PER_LEAD
+        return {
+            "cardsSeen": self.cards_seen,
+            "cardsRejected": self.cards_rejected,
+            "profileVisitsSaved": visits,
+            "estimatedSecondsSaved": round(visits * ENRICH_SECONDS_PER_VISIT),
+        }
+
+    def report(self) -> dict:
+        return {"predicates": [predicate.to_dict() for predicate in self.predicates], **self.savings()}
+
+
+def _split(text: Optional[str]) -> List[str]:
+    return [part.strip() for part in re.split(r"[,;\n]", text or "") if part.strip()]
+
+
+def plan_query(payload: dict) -> QueryPlan:
+    """Places every criterion of a search payload (PromptRequest or SearchLeadRequest fields)."""
+    plan = QueryPlan(
+        job_title=payload.get("jobTitle"),
+        seniority_levels=payload.get("seniorityLevel") or [],
+        years_of_experience=payload.get("yearsOfExperience"),
+        industry=payload.get("industry"),
+    )
+    predicates = plan.predicates
+
+    if plan.job_title:
+        predicates.append(Predicate("jobTitle", plan.job_title, PUSHDOWN, "CURRENT_TITLE keyword filter"))
+        if plan.title_min_score:
+            predicates.append(Predicate("jobTitle", plan.job_title, LOCAL, f"card title must score {plan.title_min_score}+ (keyword matches include unrelated titles)"))
+
+    seniorities = seniority_filter_ids(plan.seniority_levels)
+    if seniorities:
+        predicates.append(Predicate("seniorityLevel", [label for _, label in seniorities], PUSHDOWN, "SENIORITY_LEVEL filter"))
+    if len(seniorities) < len(plan.seniority_levels):
+        predicates.append(Predicate("seniorityLevel", plan.seniority_levels, DROPPED, "some levels have no Sales Navigator equivalent"))
+
+    years = years_at_company_id(plan.years_of_experience)
+    if years:
+        predicates.append(Predicate("yearsOfExperience", years[1], PUSHDOWN, "YEARS_AT_CURRENT_COMPANY filter"))
+    elif plan.years_of_experience is not None:
+        predicates.append(Predicate("yearsOfExperience", plan.years_of_experience, DROPPED, "no matching tenure band"))
+
+    if plan.industry:
+        predicates.append(Predicate("industry", plan.industry, PUSHDOWN, "INDUSTRY filter, id learned from the typeahead"))
+
+    functions = payload.get("functions") or []
+    matches = [closest_choice(function, FUNCTION_IDS) for function in functions]
+    if all(matches):
+        for match in matches:
+            plan.functions.append(match)
+            predicates.append(Predicate("functions", match, PUSHDOWN, "FUNCTION filter"))
+    else:
+        # Functions are alternatives: pushing the known ones would drop the leads of
+        # the unknown ones, so all of them are matched against the card title instead
+        for function in functions:
+            plan.local_functions.append(function)
+            predicates.append(Predicate("functions", function, LOCAL, "not every function has a FUNCTION id, matched against the card title"))
+
+    for headcount in payload.get("companyHeadcount") or []:
+        match = closest_choice(headcount, COMPANY_HEADCOUNT_IDS)
+        if match:
+            plan.company_headcount.append(match)
+            predicates.append(Predicate("companyHeadcount", match, PUSHDOWN, "COMPANY_HEADCOUNT filter"))
+        else:
+            predicates.append(Predicate("companyHeadcount", headcount, DROPPED, "not a headcount band, and cards carry no headcount"))
+
+    for criterion in _split(payload.get("goodToHave")):
+        predicates.append(Predicate("goodToHave", criterion, DEFERRED, "free text, needs the enriched profile"))
+
+    for predicate in predicates:
+        logging.info(f"Query plan: {predicate.criterion}={predicate.value!r} -> {predicate.placement} ({predicate.reason})")
+    return plan
@@ -0,0 +1,35 @@
+import os
+import json
+import hashlib
+from datetime import timedelta
+from service.job_queue import get_cached_job
+
+RESULT_CACHE_TTL_HOURS = float(os.getenv("RESULT_CACHE_TTL_HOURS", "24"))  # 0 disables the cache
+
+# Payload fields that decide which leads a scrape returns. goodToHave is left
+# out: nothing in the scrape or the relevance score reads it.
+CRITERIA_FIELDS = ("jobTitle", "seniorityLevel", "industry", "yearsOfExperience", "numberOfLeads", "functions", "companyHeadcount")
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, (list, tuple, set)):
+        return sorted({_normalize(item) for item in value})
+    return value
+
+
+def criteria_hash(payload: dict) -> str:
+    """
+    sha256 of the canonicalized search criteria, so requests that differ only
+    in case, spacing or seniority order share one key.
+    """
+    criteria = {field: _normalize(payload.get(field)) for field in CRITERIA_FIELDS}
+    return hashlib.sha256(json.dumps(criteria, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+async def find_cached_job(criteria_hash: str, ttl_hours: float = RESULT_CACHE_TTL_HOURS):
+    """The finished job whose leads can answer `criteria_hash`, if one completed within the TTL."""
+    if ttl_hours <= 0:
+        return None
+    return await get_cached_job(criteria_hash, timedelta(hours=ttl_hours))
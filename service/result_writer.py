@@ -0,0 +1,188 @@
+import os
+import atexit
+import logging
+import threading
+from sqlalchemy import func
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.dialects.postgresql import insert
+from database.postgres import engine_sqlalchemy
+from schema.entity.lead import Lead
+from schema.entity.company import Company
+from utils.date_convert import gmt7now
+from utils.uuid import str_of_uuid7
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+RESULT_BATCH_SIZE = int(os.getenv("RESULT_BATCH_SIZE", "200"))
+RESULT_FLUSH_INTERVAL = float(os.getenv("RESULT_FLUSH_INTERVAL", "2"))
+
+
+def _null(value):
+    # Scrapers mark missing fields "NULL"/"NA"; store them as real NULLs
+    return None if value in ("NULL", "NA", "") else value
+
+
+class WriteBehindBuffer:
+    """
+    Collects lead and company rows from the scraping threads and writes them
+    in the background as multi-row upserts (INSERT ... ON CONFLICT DO UPDATE),
+    keyed on (session_id, member_id) and company_id. A batch goes out when it
+    reaches `batch_size` rows or every `flush_interval` seconds; `flush()`
+    blocks until everything added so far is committed. A batch the database
+    rejects is written row by row and the offending rows are logged and
+    dropped; batches that fail for any other reason are retried.
+    """
+
+    def __init__(self, batch_size: int = RESULT_BATCH_SIZE, flush_interval: float = RESULT_FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._leads = {}
+        self._companies = {}
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()  # one writer at a time, batches stay in order
+        self._thread = None
+        self._closed = False
+        atexit.register(self.close)
+
+    def _ensure_started(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+            self._thread.start()
+
+    def add_lead(self, session_id: str, record):
+        """Queues a `pipeline.LeadRecord`; a later add for the same lead replaces the earlier one."""
+        card, contact = record.card, record.contact
+        member_id = card.member_id or card.profile_link
+        row = {
+            "session_id": session_id,
+            "member_id": member_id,
+            "position": card.index,
+            "name": _null(card.name),
+            "title": _null(card.title),
+            "profile_link": _null(card.profile_link),
+            "location": _null(card.location),
+            "about": _null(contact.get("About")),
+            "linkedin_url": _null(contact.get("Linkedin URL")),
+            "phones": _null(contact.get("Phone(s)")),
+            "emails": _null(contact.get("Email(s)")),
+            "websites": _null(contact.get("Website(s)")),
+            "socials": _null(contact.get("Social(s)")),
+            "addresses": _null(contact.get("Address(s)")),
+            "company_id": card.company_id,
+            "company_name": _null(card.company),
+            "company_link": _null(card.company_link),
+            "relevance_score": record.relevance_score,
+        }
+        self._add(self._leads, (session_id, member_id), row)
+
+    def add_company(self, company_id: str, name: str, link: str, company: dict):
+        row = {
+            "company_id": company_id,
+            "name": _null(name),
+            "link": _null(link),
+            "overview": _null(company.get("Company Overview")),
+            "headquarters": _null(company.get("Company Headquarters")),
+            "website": _null(company.get("Company Website")),
+            "scraped_at": gmt7now(),
+        }
+        self._add(self._companies, company_id, row)
+
+    def _add(self, pending: dict, key, row: dict):
+        with self._condition:
+            self._ensure_started()
+            # Keyed by the conflict target: Postgres rejects one statement touching a row twice
+            pending[key] = row
+            if len(self._leads) + len(self._companies) >= self.batch_size:
+                self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                logging.error(f"Result writer flush failed, will retry: {e}")
+
+    def flush(self):
+        with self._flush_lock:
+            with self._condition:
+                leads, self._leads = list(self._leads.values()), {}
+                companies, self._companies = list(self._companies.values()), {}
+            if not leads and not companies:
+                return
+            try:
+                with engine_sqlalchemy.begin() as conn:
+                    # Companies first, leads reference them by company_id
+                    for start in range(0, len(companies), self.batch_size):
+                        conn.execute(self._upsert_companies(companies[start:start + self.batch_size]))
+                    for start in range(0, len(leads), self.batch_size):
+                        conn.execute(self._upsert_leads(leads[start:start + self.batch_size]))
+            except (DataError, IntegrityError) as e:
+                # Retrying the same batch would fail forever on the same row
+                logging.warning(f"Result writer batch rejected, writing it row by row: {e.orig}")
+                self._write_rows(leads, companies)
+                return
+            except Exception:
+                self._requeue(leads, companies)
+                raise
+            logging.info(f"Result writer stored {len(leads)} leads and {len(companies)} companies")
+
+    def _write_rows(self, leads: list, companies: list):
+        stored = dropped = 0
+        rows = [("company", row) for row in companies] + [("lead", row) for row in leads]
+        for position, (kind, row) in enumerate(rows):
+            upsert = self._upsert_companies if kind == "company" else self._upsert_leads
+            try:
+                with engine_sqlalchemy.begin() as conn:
+                    conn.execute(upsert([row]))
+                stored += 1
+            except (DataError, IntegrityError) as e:
+                key = row["company_id"] if kind == "company" else row["member_id"]
+                logging.error(f"Result writer dropped {kind} {key}: {e.orig}")
+                dropped += 1
+            except Exception:
+                rest = rows[position:]
+                self._requeue([row for kind, row in rest if kind == "lead"], [row for kind, row in rest if kind == "company"])
+                raise
+        logging.info(f"Result writer stored {stored} rows one by one and dropped {dropped}")
+
+    def _requeue(self, leads: list, companies: list):
+        # Put the rows back (unless newer versions arrived meanwhile) so the next flush retries them
+        with self._condition:
+            for row in leads:
+                self._leads.setdefault((row["session_id"], row["member_id"]), row)
+            for row in companies:
+                self._companies.setdefault(row["company_id"], row)
+
+    @staticmethod
+    def _upsert_leads(rows: list):
+        statement = insert(Lead).values([{"id": str_of_uuid7(), **row} for row in rows])
+        updated = {column: statement.excluded[column] for column in rows[0] if column not in ("session_id", "member_id")}
+        return statement.on_conflict_do_update(
+            constraint="uq_lead_session_id_member_id",
+            set_={**updated, "updated_at": func.now()},
+        )
+
+    @staticmethod
+    def _upsert_companies(rows: list):
+        statement = insert(Company).values([{"id": str_of_uuid7(), **row} for row in rows])
+        updated = {column: statement.excluded[column] for column in rows[0] if column != "company_id"}
+        return statement.on_conflict_do_update(
+            index_elements=[Company.company_id],
+            set_={**updated, "updated_at": func.now()},
+        )
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        try:
+            self.flush()
+        except Exception as e:
+            logging.error(f"Result writer could not store pending rows on shutdown: {e}")
+
+
+result_writer = WriteBehindBuffer()
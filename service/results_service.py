@@ -0,0 +1,79 @@
+from typing import Optional
+from sqlalchemy import select, tuple_
+from database.postgres import create_async_session
+from schema.entity.lead import Lead
+from schema.entity.company import Company
+
+RESULTS_PAGE_SIZE = 50
+RESULTS_MAX_PAGE_SIZE = 500
+
+
+def leads_query(session_id: str, company: str = None, location: str = None, min_score: int = None):
+    """Select of a session's leads (joined with their company) in search result order."""
+    query = (
+        select(Lead, Company.overview, Company.headquarters, Company.website)
+        .outerjoin(Company, Company.company_id == Lead.company_id)
+        .where(Lead.session_id == session_id)
+        .order_by(Lead.position, Lead.id)
+    )
+    if company:
+        query = query.where(Lead.company_name.ilike(f"%{company}%"))
+    if location:
+        query = query.where(Lead.location.ilike(f"%{location}%"))
+    if min_score is not None:
+        query = query.where(Lead.relevance_score >= min_score)
+    return query
+
+
+def after_cursor(query, cursor: str):
+    """Continue `query` after the lead `cursor` (see `cursor_of`) points at. Raises ValueError for a malformed cursor."""
+    position, _, lead_id = cursor.partition(":")
+    if not lead_id:
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    # id breaks ties: a retried search can store two leads at the same position
+    return query.where(tuple_(Lead.position, Lead.id) > tuple_(int(position), lead_id))
+
+
+def cursor_of(lead: Lead) -> str:
+    return f"{lead.position}:{lead.id}"
+
+
+def to_result(lead: Lead, overview: str = None, headquarters: str = None, website: str = None) -> dict:
+    """A stored lead keyed like the leadsSummaryTable columns (see leads_service.init)."""
+    return {
+        "id": lead.id,
+        "leadName": lead.name,
+        "leadUrl": lead.linkedin_url or lead.profile_link,
+        "jobTitle": lead.title,
+        "location": lead.location,
+        "about": lead.about,
+        "leadEmail": lead.emails,
+        "leadPhone": lead.phones,
+        "companyName": lead.company_name,
+        "companyUrl": lead.company_link,
+        "companyDescription": overview,
+        "companyHeadquarters": headquarters,
+        "companyWebsite": website,
+        "relevanceScore": lead.relevance_score,
+    }
+
+
+async def get_results_page(session_id: str, cursor: Optional[str] = None, limit: int = RESULTS_PAGE_SIZE,
+                           company: str = None, location: str = None, min_score: int = None) -> dict:
+    """
+    One page of a session's leads. `cursor` points at the last lead of the
+    previous page, so every page is a range scan on (session_id, position, id)
+    however deep the client pages. The company/location/score filters are
+    checked on the rows the scan reads.
+    """
+    query = leads_query(session_id, company, location, min_score)
+    if cursor:
+        query = after_cursor(query, cursor)
+    async with create_async_session() as session:
+        rows = (await session.execute(query.limit(limit + 1))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "results": [to_result(*row) for row in rows],
+        "nextCursor": cursor_of(rows[-1][0]) if has_more else None,
+    }
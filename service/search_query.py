@@ -0,0 +1,264 @@
+import os
+import re
+import json
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import List, Optional
+from urllib.parse import quote, unquote
+from fuzzywuzzy import process
+from utils.constant import SeniorityLevel, YearsOfExperience, Functions, CompanyHeadcount
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEARCH_URL = "https://www.linkedin.com/sales/search/people"
+FILTER_IDS_PATH = os.getenv("SALES_NAV_FILTER_IDS_PATH", "cache/sales_nav_filter_ids.json")
+
+# Our taxonomy (utils/constant) -> Sales Navigator filter ids and labels
+SENIORITY_IDS = {
+    SeniorityLevel.ENTRY: (110, "Entry Level"),
+    SeniorityLevel.SENIOR: (120, "Senior"),
+    SeniorityLevel.MANAGER: (210, "Experienced Manager"),
+    SeniorityLevel.DIRECTOR: (220, "Director"),
+    SeniorityLevel.VP: (300, "Vice President"),
+    SeniorityLevel.CX: (310, "CXO"),
+    SeniorityLevel.CXO: (310, "CXO"),
+    SeniorityLevel.PARTNER: (320, "Owner / Partner"),
+    SeniorityLevel.OWNER: (320, "Owner / Partner"),
+}
+# Sales Navigator's own labels are accepted as well, e.g. "Director" or "In Training"
+SENIORITY_CHOICES = {
+    **SENIORITY_IDS,
+    **{label: (id, label) for id, label in [
+        (100, "In Training"), (110, "Entry Level"), (120, "Senior"), (130, "Strategic"),
+        (200, "Entry Level Manager"), (210, "Experienced Manager"), (220, "Director"),
+        (300, "Vice President"), (310, "CXO"), (320, "Owner / Partner"),
+    ]},
+}
+
+YEARS_AT_CURRENT_COMPANY_IDS = {
+    YearsOfExperience.LESS_THAN_ONE_YEAR: 1,
+    YearsOfExperience.ONE_TO_TWO_YEARS: 2,
+    YearsOfExperience.THREE_TO_FIVE_YEARS: 3,
+    YearsOfExperience.SIX_TO_TEN_YEARS: 4,
+    YearsOfExperience.MORE_THAN_TEN_YEARS: 5,
+}
+
+COMPANY_HEADCOUNT_IDS = {
+    CompanyHeadcount.SELF_EMPLOYED: "A",
+    CompanyHeadcount.SMALL_BUSINESS: "B",
+    CompanyHeadcount.SMALL_MID_SIZED_BUSINESS: "C",
+    CompanyHeadcount.MID_SIZED_BUSINESS: "D",
+    CompanyHeadcount.MID_LARGE_SIZED_BUSINESS: "E",
+    CompanyHeadcount.LARGE_BUSINESS: "F",
+    CompanyHeadcount.VERY_LARGE_BUSINESS: "G",
+    CompanyHeadcount.ENTERPRISE_BUSINESS: "H",
+    CompanyHeadcount.GLOBAL_ENTERPRISE: "I",
+}
+
+FUNCTION_IDS = {
+    Functions.ADMINSTRATIVE: 2,
+    Functions.BUSINESS_DEVELOPMENT: 4,
+    Functions.CONSULTING: 6,
+    Functions.EDUCATION: 7,
+    Functions.ENGINEERING: 8,
+    Functions.ENTREPRENEURSHIP: 9,
+    Functions.FINANCE: 10,
+    Functions.HEALTHCARE_SERVICES: 11,
+    Functions.HUMAN_RESOURCES: 12,
+    Functions.INFORMATION_TECHNOLOGY: 13,
+    Functions.LEGAL: 14,
+    Functions.MARKETING: 15,
+    Functions.MEDIA_COMMUNICATION: 16,
+    Functions.MILITARY_PROTECTIVE_SERVICES: 17,
+    Functions.OPERATIONS: 18,
+    Functions.PRODUCT_MANAGEMENT: 19,
+    Functions.PROGRAMS_PROJECT_MANAGEMENT: 20,
+    Functions.PURCHASING: 21,
+    Functions.QUALITY_ASSURANCE: 22,
+    Functions.REAL_ESTATE: 23,
+    Functions.RESEARCH: 24,
+    Functions.SALES: 25,
+    Functions.SUPPORT: 26,
+}
+
+# (type:INDUSTRY,values:List((id:96,text:IT%20Services...,selectionType:INCLUDED)))
+FILTER_VALUE_PATTERN = r"type:{type},values:List\(\(id:([^,]+),text:(.*?),selectionType:INCLUDED"
+
+
+def _encode(text: str) -> str:
+    # Rest.li query syntax reserves ( ) , : and ' inside values
+    return quote(str(text), safe="")
+
+
+def _value(text: str, id=None) -> str:
+    parts = [f"id:{_encode(id)}"] if id is not None else []
+    parts.append(f"text:{_encode(text)}")
+    parts.append("selectionType:INCLUDED")
+    return f"({','.join(parts)})"
+
+
+def _filter(type: str, values: List[str]) -> str:
+    return f"(type:{type},values:List({','.join(values)}))"
+
+
+def closest_choice(value: str, choices, score_cutoff: int = 70) -> Optional[str]:
+    """The entry of `choices` closest to `value`, None below `score_cutoff`."""
+    if value is None or str(value).strip() == "":
+        return None
+    match = process.extractOne(str(value), list(choices), score_cutoff=score_cutoff)
+    return match[0] if match else None
+
+
+def seniority_filter_ids(values) -> list:
+    """(id, label) per requested seniority, matched against our taxonomy and Sales Navigator's labels."""
+    if isinstance(values, str):
+        values = [values]
+    resolved = []
+    for value in values or []:
+        match = closest_choice(value, SENIORITY_CHOICES)
+        if match:
+            resolved.append(SENIORITY_CHOICES[match])
+    return list(dict.fromkeys(resolved))
+
+
+def years_at_company_id(value) -> Optional[tuple]:
+    """(id, label) for a number of years or one of the YearsOfExperience labels."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) or str(value).strip().isdigit():
+        years = float(value)
+        label = (YearsOfExperience.LESS_THAN_ONE_YEAR if years < 1 else
+                 YearsOfExperience.ONE_TO_TWO_YEARS if years <= 2 else
+                 YearsOfExperience.THREE_TO_FIVE_YEARS if years <= 5 else
+                 YearsOfExperience.SIX_TO_TEN_YEARS if years <= 10 else
+                 YearsOfExperience.MORE_THAN_TEN_YEARS)
+    else:
+        label = closest_choice(value, YEARS_AT_CURRENT_COMPANY_IDS, score_cutoff=60)
+    return (YEARS_AT_CURRENT_COMPANY_IDS[label], label) if label else None
+
+
+class FilterIdCache:
+    """
+    Filter ids that have no fixed table (industries), learned once from the
+    typeahead and persisted as JSON: {"INDUSTRY": {"Renewables & Environment": "86"}}.
+    """
+
+    def __init__(self, path: str = FILTER_IDS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = None
+
+    def _load(self) -> dict:
+        if self._ids is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    self._ids = json.load(file)
+            except (OSError, ValueError):
+                self._ids = {}
+        return self._ids
+
+    def get(self, filter_type: str, text: str) -> Optional[tuple]:
+        """(id, label) learned for `text`, matched case-insensitively."""
+        for reload in (False, True):
+            with self._lock:
+                if reload:
+                    self._ids = None  # another worker may have learned it since
+                known = dict(self._load().get(filter_type, {}))
+            for label, id in known.items():
+                if label.lower() == str(text).strip().lower():
+                    return id, label
+        return None
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock on the cache file across processes, held for a whole load-merge-replace."""
+        with open(f"{self.path}.lock", "a+b") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def learn(self, filter_type: str, text: str, id: str, label: str = None):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, self._file_lock():
+            self._ids = None  # merge with what other workers wrote
+            ids = self._load()
+            ids.setdefault(filter_type, {})[label or text] = id
+            if label and label.lower() != str(text).lower():
+                ids[filter_type][text] = id
+            file_descriptor, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=f".{os.path.basename(self.path)}.", suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w", encoding="utf-8") as file:
+                    json.dump(ids, file, ensure_ascii=False, indent=2, sort_keys=True)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        logging.info(f"Learned Sales Navigator {filter_type} id {id} for '{text}'")
+
+    def learn_from_url(self, filter_type: str, text: str, url: str) -> Optional[tuple]:
+        """Reads the id the UI put into the search URL after `text` was included."""
+        values = re.findall(FILTER_VALUE_PATTERN.format(type=filter_type), unquote(unquote(url)))
+        if not values:
+            return None
+        id, label = values[-1]
+        self.learn(filter_type, text, id, label)
+        return id, label
+
+
+filter_ids = FilterIdCache()
+
+
+def build_search_url(job_title: str = None, seniority_levels=None, years_of_experience=None,
+                     industry: tuple = None, functions: List[str] = None, company_headcount: List[str] = None) -> str:
+    """
+    Sales Navigator people-search URL with every filter encoded in the
+    `query=(filters:List(...))` parameter, so one navigation replaces the
+    click-through filter panel. `industry` is an (id, label) pair, see `filter_ids`.
+    """
+    filters = []
+    if job_title:
+        filters.append(_filter("CURRENT_TITLE", [_value(job_title)]))
+    seniorities = seniority_filter_ids(seniority_levels)
+    if seniorities:
+        filters.append(_filter("SENIORITY_LEVEL", [_value(label, id) for id, label in seniorities]))
+    years = years_at_company_id(years_of_experience)
+    if years:
+        filters.append(_filter("YEARS_AT_CURRENT_COMPANY", [_value(years[1], years[0])]))
+    if industry:
+        filters.append(_filter("INDUSTRY", [_value(industry[1], industry[0])]))
+    function_values = []
+    for function in functions or []:
+        match = closest_choice(function, FUNCTION_IDS)
+        if match:
+            function_values.append(_value(match, FUNCTION_IDS[match]))
+    if function_values:
+        filters.append(_filter("FUNCTION", function_values))
+    headcount_values = []
+    for headcount in company_headcount or []:
+        match = closest_choice(headcount, COMPANY_HEADCOUNT_IDS)
+        if match:
+            headcount_values.append(_value(match, COMPANY_HEADCOUNT_IDS[match]))
+    if headcount_values:
+        filters.append(_filter("COMPANY_HEADCOUNT", headcount_values))
+    return f"{SEARCH_URL}?query=(filters:List({','.join(filters)}))&viewAllFilters=true"
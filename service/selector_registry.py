@@ -0,0 +1,278 @@
+import os
+import json
+import glob
+import time
+import atexit
+import socket
+import threading
+import logging
+from selenium import webdriver
+from service.dom_extract import extract
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SELECTOR_STATS_DIR = os.getenv("SELECTOR_STATS_DIR", "selector_stats")
+SELECTOR_STATS_MAX_AGE = float(os.getenv("SELECTOR_STATS_MAX_AGE_DAYS", "7")) * 24 * 60 * 60
+FLUSH_INTERVAL = 30
+COMPACTED_PREFIX = "compacted-"
+RECENT_WEIGHT = 0.1  # weight of the latest outcome in the recent hit rate
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill would terminate it; such files only age out
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_rows(path: str) -> list:
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return []
+
+
+def _merge(rows: list, baseline: dict, recents: dict):
+    for name, field, key, values in rows:
+        stats = baseline.setdefault((name, field, key), SelectorStats())
+        stats.hits += values["hits"]
+        stats.misses += values["misses"]
+        stats.total_ms += values["totalMs"]
+        recents.setdefault((name, field, key), []).append(values.get("recent", 0.5))
+
+
+def _averaged(baseline: dict, recents: dict) -> dict:
+    for key, values in recents.items():
+        baseline[key].recent = sum(values) / len(values)
+    return baseline
+
+
+def candidate_key(candidate: dict) -> str:
+    locator = f"css:{candidate['css']}" if "css" in candidate else f"xpath:{candidate['xpath']}"
+    return f"{locator}@{candidate.get('attr', 'text')}"
+
+
+class SelectorStats:
+    def __init__(self, hits=0, misses=0, total_ms=0.0, recent=0.5):
+        self.hits = hits
+        self.misses = misses
+        self.total_ms = total_ms
+        # Exponentially weighted hit rate, reacts within a few rows when a selector stops matching
+        self.recent = recent
+
+    def add(self, hit: bool, elapsed_ms: float):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.total_ms += elapsed_ms
+        self.recent += RECENT_WEIGHT * ((1.0 if hit else 0.0) - self.recent)
+
+    @property
+    def hit_rate(self) -> float:
+        # Laplace smoothing so new selectors are neither trusted nor written off after one try
+        return (self.hits + 1) / (self.hits + self.misses + 2)
+
+    @property
+    def avg_ms(self) -> float:
+        tries = self.hits + self.misses
+        return self.total_ms / tries if tries else 0.0
+
+    def to_dict(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "totalMs": round(self.total_ms, 3), "recent": round(self.recent, 4)}
+
+
+class SelectorRegistry:
+    """
+    Central registry of named field specs (see dom_extract). Records hits,
+    misses and latency per selector and orders every field's fallbacks by
+    recent hit rate, so after a LinkedIn layout change the selector that still works
+    moves to the front. Stats are flushed per process to SELECTOR_STATS_DIR
+    and merged on start-up, so what one worker learns carries over. Files of
+    exited processes are folded into one compacted file, and files nobody
+    wrote for SELECTOR_STATS_MAX_AGE are deleted (see `compact`).
+    """
+
+    def __init__(self, stats_dir: str = SELECTOR_STATS_DIR):
+        self.stats_dir = stats_dir
+        self._specs = {}
+        self._local = {}      # counted by this process, the only part flushed to its stats file
+        self._baseline = {}   # merged from the stats files of other processes
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self._stats_path = os.path.join(stats_dir, f"{socket.gethostname()}-{os.getpid()}.json")
+        self.reload()
+        atexit.register(self.flush)
+
+    def register(self, name: str, spec: dict):
+        with self._lock:
+            self._specs[name] = spec
+
+    def spec(self, name: str) -> dict:
+        """The named spec with each field's candidates ordered best-first."""
+        with self._lock:
+            ordered = {}
+            for field, candidates in self._specs[name].items():
+                def score(indexed):
+                    index, candidate = indexed
+                    stats = self._get((name, field, candidate_key(candidate)))
+                    return (-round(stats.recent, 2), stats.avg_ms, index)
+                ordered[field] = [candidate for _, candidate in sorted(enumerate(candidates), key=score)]
+            return ordered
+
+    def extract(self, driver: webdriver.Chrome, name: str, root_selector: str = None) -> list:
+        spec = self.spec(name)
+        results = extract(driver, spec, root_selector)
+        self.record(name, spec, results)
+        return results
+
+    def extract_records(self, driver: webdriver.Chrome, name: str, root_selector: str = None, default=None) -> list:
+        records = []
+        for result in self.extract(driver, name, root_selector):
+            records.append({field: (value if value is not None else default) for field, value in result["values"].items()})
+        return records
+
+    def record(self, name: str, spec: dict, results: list):
+        """Account every candidate tried in `results` as a hit or a miss."""
+        with self._lock:
+            for result in results:
+                for field, timings in result.get("timings", {}).items():
+                    hit_index = result["hits"][field]
+                    for index, elapsed in enumerate(timings):
+                        key = (name, field, candidate_key(spec[field][index]))
+                        self._local.setdefault(key, SelectorStats()).add(index == hit_index, elapsed)
+        if time.time() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+
+    def stats(self) -> dict:
+        """{spec: {field: [{selector, hits, misses, hitRate, recentHitRate, avgMs}, ...]}} in current fallback order."""
+        report = {}
+        for name in list(self._specs):
+            report[name] = {}
+            for field, candidates in self.spec(name).items():
+                rows = []
+                for candidate in candidates:
+                    key = candidate_key(candidate)
+                    stats = self._get((name, field, key))
+                    rows.append({
+                        "selector": key,
+                        "hits": stats.hits,
+                        "misses": stats.misses,
+                        "hitRate": round(stats.hit_rate, 3),
+                        "recentHitRate": round(stats.recent, 3),
+                        "avgMs": round(stats.avg_ms, 3),
+                    })
+                report[name][field] = rows
+        return report
+
+    def flush(self):
+        with self._lock:
+            data = [[name, field, key, stats.to_dict()] for (name, field, key), stats in self._local.items()]
+            self._last_flush = time.time()
+        try:
+            os.makedirs(self.stats_dir, exist_ok=True)
+            tmp_path = f"{self._stats_path}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self._stats_path)
+        except OSError as e:
+            logging.warning(f"Could not flush selector stats: {e}")
+
+    def reload(self):
+        """Re-read what the other processes (e.g. the scrape workers) have flushed."""
+        self.compact()
+        baseline = {}
+        recents = {}
+        for path in self._other_files():
+            _merge(_read_rows(path), baseline, recents)
+        with self._lock:
+            self._baseline = _averaged(baseline, recents)
+
+    def compact(self, max_age: float = SELECTOR_STATS_MAX_AGE):
+        """
+        Deletes stats files not written for `max_age` seconds and folds the
+        files of exited processes on this host (and earlier compacted files)
+        into one new compacted file. Other hosts' files can't be checked for
+        a live process, they only age out. Each file is claimed by renaming
+        it first, so concurrent compactions never count a file twice.
+        """
+        now = time.time()
+        host = socket.gethostname()
+        candidates = []
+        for path in self._other_files():
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > max_age:
+                self._remove(path)
+                continue
+            name = os.path.basename(path)[:-len(".json")]
+            if not name.startswith(COMPACTED_PREFIX):
+                owner, _, pid = name.rpartition("-")
+                if owner != host or not pid.isdigit() or _pid_alive(int(pid)):
+                    continue
+            candidates.append((path, mtime))
+        exited = [path for path, _ in candidates if not os.path.basename(path).startswith(COMPACTED_PREFIX)]
+        if not exited and len(candidates) < 2:
+            return  # at most one compacted file, nothing to fold into it
+
+        claimed = []
+        newest = 0.0
+        for path, mtime in candidates:
+            claim = f"{path}.{os.getpid()}.claimed"
+            try:
+                os.rename(path, claim)
+            except OSError:
+                continue  # claimed by another process
+            claimed.append((path, claim))
+            newest = max(newest, mtime)
+        if not claimed:
+            return
+
+        baseline = {}
+        recents = {}
+        for _, claim in claimed:
+            _merge(_read_rows(claim), baseline, recents)
+        data = [[name, field, key, stats.to_dict()] for (name, field, key), stats in _averaged(baseline, recents).items()]
+        compacted_path = os.path.join(self.stats_dir, f"{COMPACTED_PREFIX}{host}-{os.getpid()}-{int(now)}.json")
+        try:
+            with open(f"{compacted_path}.tmp", "w") as file:
+                json.dump(data, file)
+            os.replace(f"{compacted_path}.tmp", compacted_path)
+            # Keeps the age of the newest data it holds, so it ages out once nothing new is folded in
+            os.utime(compacted_path, (newest, newest))
+        except OSError as e:
+            logging.warning(f"Could not compact selector stats: {e}")
+            for path, claim in claimed:
+                os.replace(claim, path)
+            return
+        for _, claim in claimed:
+            self._remove(claim)
+        logging.info(f"Compacted {len(claimed)} selector stats file(s) into {compacted_path}")
+
+    def _other_files(self) -> list:
+        own = os.path.abspath(self._stats_path)
+        return [path for path in glob.glob(os.path.join(self.stats_dir, "*.json")) if os.path.abspath(path) != own]
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _get(self, key) -> SelectorStats:
+        local = self._local.get(key, SelectorStats())
+        baseline = self._baseline.get(key, SelectorStats())
+        recent = local.recent if key in self._local else baseline.recent
+        return SelectorStats(local.hits + baseline.hits, local.misses + baseline.misses, local.total_ms + baseline.total_ms, recent)
+
+
+selector_registry = SelectorRegistry()
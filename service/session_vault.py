@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import logging
+from cryptography.fernet import InvalidToken
+from selenium import webdriver
+from dotenv import load_dotenv
+from utils.string_generator import cipher
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+VAULT_DIR = os.getenv("SESSION_VAULT_DIR", ".sessions")
+LINKEDIN_ACCOUNT = os.getenv("LINKEDIN_USERNAME")
+AUTH_COOKIE = "li_at"
+REFRESH_MARGIN = 24 * 60 * 60  # refresh sessions whose auth cookie expires within a day
+REFRESH_INTERVAL = 60 * 60
+COOKIE_ORIGIN_URL = "https://www.linkedin.com/robots.txt"  # cheapest page on the cookie domain
+VALIDATE_URL = "https://www.linkedin.com/sales/home"
+
+
+class SessionVault:
+    """
+    Encrypted, per-account store of authenticated LinkedIn cookies and localStorage.
+    Entries are Fernet-encrypted with the key from `utils.string_generator`.
+    """
+
+    def __init__(self, vault_dir: str = VAULT_DIR):
+        self.vault_dir = vault_dir
+        self._lock = threading.Lock()
+        self._refresher = None
+
+    def _path(self, account: str) -> str:
+        digest = hashlib.sha256(account.encode()).hexdigest()
+        return os.path.join(self.vault_dir, f"{digest}.session")
+
+    def save(self, account: str, driver: webdriver.Chrome):
+        """Snapshot the cookies and localStorage of an authenticated driver."""
+        if not account:
+            logging.warning("LINKEDIN_USERNAME is not set, the LinkedIn session is not vaulted.")
+            return
+        try:
+            local_storage = driver.execute_script("return Object.assign({}, window.localStorage);")
+        except Exception as e:
+            logging.warning(f"Could not read localStorage for vault entry: {e}")
+            local_storage = {}
+        entry = {
+            "account": account,
+            "cookies": driver.get_cookies(),
+            "localStorage": local_storage or {},
+            "savedAt": time.time(),
+        }
+        os.makedirs(self.vault_dir, exist_ok=True)
+        path = self._path(account)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, "wb") as file:
+                file.write(cipher.encrypt(json.dumps(entry).encode()))
+            os.replace(tmp_path, path)
+        logging.info(f"Saved LinkedIn session for {account} to vault ({len(entry['cookies'])} cookies).")
+
+    def load(self, account: str):
+        if not account:
+            return None
+        path = self._path(account)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as file:
+                return json.loads(cipher.decrypt(file.read()))
+        except (InvalidToken, ValueError) as e:
+            logging.error(f"Discarding unreadable vault entry for {account}: {e}")
+            return None
+
+    def expires_at(self, entry: dict):
+        for cookie in entry.get("cookies", []):
+            if cookie.get("name") == AUTH_COOKIE:
+                return cookie.get("expiry")
+        return None
+
+    def is_expiring(self, entry: dict, margin: float = REFRESH_MARGIN) -> bool:
+        expiry = self.expires_at(entry)
+        return expiry is None or expiry - time.time() < margin
+
+    def has_session(self, account: str) -> bool:
+        """Whether the vault holds an unexpired session for `account`. Reads the vault only, no browser."""
+        entry = self.load(account)
+        return bool(entry) and not self.is_expiring(entry, margin=0)
+
+    def restore(self, account: str, driver: webdriver.Chrome) -> bool:
+        """Inject a stored session into a fresh driver and validate it with one navigation."""
+        entry = self.load(account)
+        if not entry or self.is_expiring(entry, margin=0):
+            return False
+
+        driver.get(COOKIE_ORIGIN_URL)
+        for cookie in entry["cookies"]:
+            cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")}
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logging.warning(f"Skipping cookie {cookie.get('name')}: {e}")
+        if entry.get("localStorage"):
+            driver.execute_script(
+                "for (const [k, v] of Object.entries(arguments[0])) { window.localStorage.setItem(k, v); }",
+                entry["localStorage"],
+            )
+
+        driver.get(VALIDATE_URL)
+        if '/login' in driver.current_url or '/checkpoint' in driver.current_url:
+            logging.info(f"Stored session for {account} is no longer valid.")
+            return False
+        logging.info(f"Restored LinkedIn session for {account} from vault.")
+        return True
+
+    def refresh(self, account: str, pool) -> bool:
+        """
+        Visit LinkedIn with an idle pooled browser so it rotates the session,
+        then save the new cookies. Browsers busy with a job are left alone;
+        returns False when none was idle.
+        """
+        browser = pool.lease_idle()
+        if browser is None:
+            return False
+        discard = False
+        try:
+            # On the browser's own driver thread, like the jobs that lease it
+            discard = not browser.async_driver.call(self._refresh_driver, account, browser.driver)
+        finally:
+            pool.release(browser, discard=discard)
+        return True
+
+    def _refresh_driver(self, account: str, driver: webdriver.Chrome) -> bool:
+        driver.get(VALIDATE_URL)
+        if '/login' in driver.current_url:
+            return False
+        self.save(account, driver)
+        return True
+
+    def start_refresher(self, pool, account: str = LINKEDIN_ACCOUNT, interval: float = REFRESH_INTERVAL):
+        """Refresh the account's session in the background before the auth cookie expires."""
+        if self._refresher or not account:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                entry = self.load(account)
+                if entry and self.is_expiring(entry):
+                    try:
+                        if not self.refresh(account, pool):
+                            logging.info(f"No idle browser to refresh the session for {account}, retrying next round")
+                    except Exception as e:
+                        logging.error(f"Background session refresh failed for {account}: {e}")
+
+        self._refresher = threading.Thread(target=run, name="session-vault-refresher", daemon=True)
+        self._refresher.start()
+
+
+session_vault = SessionVault()
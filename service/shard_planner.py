@@ -0,0 +1,134 @@
+import os
+import queue
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List, Optional
+from selenium import webdriver
+from service.search_query import COMPANY_HEADCOUNT_IDS
+from utils.linkedin_url import member_id
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+SEARCH_RESULT_CAP = 2500  # Sales Navigator pages through at most 100 x 25 results of one query
+SHARD_MIN_LEADS = int(os.getenv("SHARD_MIN_LEADS", "50"))  # smaller orders run as one query
+HEADCOUNT_BANDS = list(COMPANY_HEADCOUNT_IDS)
+SHARD_QUEUE_SIZE = 25  # leads buffered per browser ahead of the merge
+_DONE = object()
+
+
+@dataclass
+class Shard:
+    """One slice of the search; None keeps the request's own filter."""
+    seniority_levels: Optional[List[str]] = None
+    company_headcount: Optional[List[str]] = None
+    catch_all: bool = False
+
+    def __str__(self) -> str:
+        parts = [", ".join(self.seniority_levels or ["any seniority"])]
+        if self.company_headcount:
+            parts.append(", ".join(self.company_headcount))
+        if self.catch_all:
+            parts.append("catch-all")
+        return " / ".join(parts)
+
+
+def plan_shards(seniority_levels: List[str], total: Optional[int], target: int, browsers: int,
+                company_headcount: List[str] = None) -> List[Shard]:
+    """
+    Splits a search for `target` leads out of `total` results (None if
+    unknown) into disjoint shards: one per requested seniority level, and
+    each of those per company headcount band (within `company_headcount`
+    if the search already filters on it) when the shards would otherwise
+    exceed the result cap or leave browsers idle. Small orders stay a
+    single query.
+
+    Leads whose company has no headcount band match none of the band
+    shards, so a band split also queues one unbanded catch-all shard per
+    seniority shard, harvested last. It overlaps the band shards (the merge
+    drops the repeats) and only reaches the first SEARCH_RESULT_CAP results,
+    so unbanded leads beyond that are still lost.
+    """
+    wanted = min(target, total) if total is not None else target
+    if wanted <= SHARD_MIN_LEADS or (browsers < 2 and wanted <= SEARCH_RESULT_CAP):
+        return [Shard(seniority_levels)]
+    levels = list(dict.fromkeys(seniority_levels or []))
+    shards = [Shard([level]) for level in levels] if len(levels) > 1 else [Shard(levels or None)]
+    if len(shards) < browsers or wanted > len(shards) * SEARCH_RESULT_CAP:
+        banded = [Shard(shard.seniority_levels, [band]) for shard in shards for band in (company_headcount or HEADCOUNT_BANDS)]
+        if not company_headcount:
+            # The request doesn't filter on headcount, so leads without a band still qualify
+            banded += [Shard(shard.seniority_levels, catch_all=True) for shard in shards]
+        shards = banded
+    return shards
+
+
+def run_shards(shards: List[Shard], drivers: List[webdriver.Chrome],
+               search: Callable[[webdriver.Chrome, Shard, int], Iterable[dict]], target: int) -> Iterator[dict]:
+    """
+    Harvests `shards` in parallel, one thread per browser taking the next
+    shard when its current one is exhausted, and yields the merged leads
+    in arrival order, de-duplicated by member id, until `target` leads were
+    yielded. `search(driver, shard, target)` yields the lead cards of one shard.
+    """
+    pending = queue.Queue()
+    for shard in shards:
+        pending.put(shard)
+    leads = queue.Queue(maxsize=SHARD_QUEUE_SIZE * len(drivers))
+    stop = threading.Event()
+    errors = []
+
+    def put(item) -> bool:
+        while not stop.is_set():
+            try:
+                leads.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def work(driver):
+        try:
+            while not stop.is_set():
+                try:
+                    shard = pending.get_nowait()
+                except queue.Empty:
+                    return
+                logging.info(f"Harvesting shard {shard}")
+                for lead in search(driver, shard, min(target, SEARCH_RESULT_CAP)):
+                    if not put(lead):
+                        return
+        except Exception as e:
+            logging.error(f"Shard harvest failed: {e}")
+            errors.append(e)
+        finally:
+            put(_DONE)
+
+    threads = [threading.Thread(target=work, args=(driver,), name=f"shard-{index}", daemon=True) for index, driver in enumerate(drivers)]
+    for thread in threads:
+        thread.start()
+
+    seen = set()
+    yielded = 0
+    finished = 0
+    try:
+        while finished < len(threads) and yielded < target:
+            lead = leads.get()
+            if lead is _DONE:
+                finished += 1
+                continue
+            # Catch-all shards overlap the band shards, and a lead with two current positions can match two shards
+            key = member_id(lead["Profile Link"]) or lead["Profile Link"]
+            if key in seen:
+                continue
+            seen.add(key)
+            yielded += 1
+            yield lead
+    finally:
+        # The browsers go back to the pool after the job, so wait until no shard uses them
+        stop.set()
+        for thread in threads:
+            thread.join()
+    logging.info(f"Merged {yielded} unique leads from {len(shards)} shard(s) on {len(drivers)} browser(s).")
+    if errors and yielded < target:
+        raise errors[0]
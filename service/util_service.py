@@ -13,6 +13,7 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 import datetime
 import requests
+from service.session_vault import session_vault, LINKEDIN_ACCOUNT
 
 
 
@@ -102,6 +103,12 @@ def launch_browser():
 
 
 def get_cookies():
+    # Serve the locally vaulted session while it is fresh, the remote browser is the fallback
+    if LINKEDIN_ACCOUNT:
+        entry = session_vault.load(LINKEDIN_ACCOUNT)
+        if entry and not session_vault.is_expiring(entry):
+            return entry["cookies"]
+
     url = f"{base_url}/remote-browser-cookies"
     payload = {"userId": "1703"}
     
@@ -0,0 +1,38 @@
+import asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+import database.postgres
+import service.job_queue as job_queue
+from schema.entity.scrape_job import ScrapeJob
+from utils.constant import ConstantsJob
+
+
+def test_enqueued_job_is_claimed(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'queue.db'}"
+    sync_engine = create_engine(url)
+    ScrapeJob.__table__.create(sync_engine)
+    monkeypatch.setattr(database.postgres, "engine", create_async_engine(url.replace("sqlite", "sqlite+aiosqlite")))
+    monkeypatch.setattr(job_queue, "engine_sqlalchemy", sync_engine)
+
+    job = asyncio.run(job_queue.enqueue_job("session-1", {"jobTitle": "CTO"}, criteria_hash="abc", idempotency_key="key-1"))
+    claimed = job_queue.claim_job("worker-1")
+
+    assert claimed is not None
+    assert claimed.id == job.id
+    assert claimed.status == ConstantsJob.RUNNING
+    assert claimed.lease_owner == "worker-1"
+    assert claimed.attempts == 1
+    assert job_queue.claim_job("worker-2") is None
+
+
+def test_enqueue_joins_active_job_with_same_idempotency_key(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'queue.db'}"
+    sync_engine = create_engine(url)
+    ScrapeJob.__table__.create(sync_engine)
+    monkeypatch.setattr(database.postgres, "engine", create_async_engine(url.replace("sqlite", "sqlite+aiosqlite")))
+
+    first = asyncio.run(job_queue.enqueue_job("session-1", {"jobTitle": "CTO"}, idempotency_key="key-1"))
+    second = asyncio.run(job_queue.enqueue_job("session-2", {"jobTitle": "CTO"}, idempotency_key="key-1"))
+
+    assert second.id == first.id
+    assert second.session_id == "session-1"
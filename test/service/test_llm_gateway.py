@@ -0,0 +1,152 @@
+import json
+import time
+import asyncio
+import threading
+import httpx
+import pytest
+from service.llm_gateway import LLMGateway, LLMError, Provider, backoff_delay, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+class StubLLM:
+    """Local stand-in for the providers: answers from a per-host script of status codes."""
+
+    def __init__(self, scripts: dict, headers: dict = None):
+        self.scripts = {host: list(statuses) for host, statuses in scripts.items()}
+        self.headers = headers or {}
+        self.calls = {host: 0 for host in scripts}
+        self.ok_calls = 0
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.calls[host] += 1
+        self.requests.append(request)
+        script = self.scripts[host]
+        status = script.pop(0) if len(script) > 1 else script[0]
+        if status != 200:
+            return httpx.Response(status, headers=self.headers.get((host, status), {}), json={"error": "stub"})
+        self.ok_calls += 1
+        if request.url.path.endswith("/api/chat"):
+            return httpx.Response(200, json={"message": {"content": f"from {host}"}, "prompt_eval_count": 7, "eval_count": 3})
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "model": body["model"],
+            "choices": [{"message": {"content": f"from {host}"}}],
+            "usage": {"prompt_tokens": 11, "completion_tokens": 5},
+        })
+
+
+def provider(name, kind="openai", api_key="key", concurrency=4):
+    return Provider(name=name, kind=kind, base_url=f"http://{name}.stub/v1", model=f"{name}-model", api_key=api_key, concurrency=concurrency)
+
+
+@pytest.fixture
+def make_gateway():
+    gateways = []
+
+    def make(providers, stub, max_retries=3):
+        gateway = LLMGateway(providers, max_retries=max_retries, transport=httpx.MockTransport(stub))
+        gateway.sleeps = []
+
+        async def sleep(delay):
+            gateway.sleeps.append(delay)
+
+        gateway._sleep = sleep
+        gateways.append(gateway)
+        return gateway
+
+    yield make
+    for gateway in gateways:
+        gateway.close()
+
+
+def test_retries_429_honouring_retry_after(make_gateway):
+    stub = StubLLM({"groq.stub": [429, 200]}, headers={("groq.stub", 429): {"Retry-After": "3"}})
+    gateway = make_gateway([provider("groq")], stub)
+
+    response = gateway.complete(MESSAGES)
+
+    assert response.content == "from groq.stub"
+    assert stub.calls["groq.stub"] == 2
+    assert gateway.sleeps == [3.0]
+    assert gateway.usage()["groq"] == {"requests": 1, "failures": 0, "promptTokens": 11, "completionTokens": 5}
+
+
+def test_falls_back_after_exhausting_retries_on_5xx(make_gateway):
+    stub = StubLLM({"groq.stub": [500], "openai.stub": [200]})
+    gateway = make_gateway([provider("groq"), provider("openai")], stub, max_retries=2)
+
+    response = gateway.complete(MESSAGES)
+
+    assert response.provider == "openai"
+    assert stub.calls == {"groq.stub": 3, "openai.stub": 1}
+    assert len(gateway.sleeps) == 2
+    assert gateway.usage()["groq"]["failures"] == 1
+    assert gateway.usage()["openai"]["requests"] == 1
+
+
+def test_4xx_is_not_retried(make_gateway):
+    stub = StubLLM({"groq.stub": [400], "openai.stub": [200]})
+    gateway = make_gateway([provider("groq"), provider("openai")], stub)
+
+    assert gateway.complete(MESSAGES).provider == "openai"
+    assert stub.calls["groq.stub"] == 1
+    assert gateway.sleeps == []
+
+
+def test_raises_when_every_provider_fails(make_gateway):
+    stub = StubLLM({"groq.stub": [400]})
+    gateway = make_gateway([provider("groq")], stub)
+
+    with pytest.raises(LLMError, match="groq"):
+        gateway.complete(MESSAGES)
+
+
+def test_skips_unconfigured_providers(make_gateway):
+    stub = StubLLM({"openai.stub": [200], "ollama.stub": [200]})
+    gateway = make_gateway([provider("openai", api_key=None), provider("ollama", kind="ollama", api_key=None)], stub)
+
+    response = gateway.complete(MESSAGES, json_output=True)
+
+    assert response.provider == "ollama"
+    assert stub.calls["openai.stub"] == 0
+    assert json.loads(stub.requests[0].content)["format"] == "json"
+    assert gateway.usage()["ollama"] == {"requests": 1, "failures": 0, "promptTokens": 7, "completionTokens": 3}
+
+
+def test_backoff_does_not_hold_the_provider_slot(make_gateway):
+    stub = StubLLM({"groq.stub": [429, 200]})
+    gateway = make_gateway([provider("groq", concurrency=1)], stub)
+    second_done = threading.Event()
+    blocked = []
+
+    async def sleep(delay):
+        # The first request backs off until the second one, which needs the only slot, got through
+        deadline = time.monotonic() + 2
+        while not second_done.is_set() and stub.ok_calls == 0:
+            if time.monotonic() > deadline:
+                blocked.append(True)
+                return
+            await asyncio.sleep(0.01)
+
+    gateway._sleep = sleep
+    first = threading.Thread(target=gateway.complete, args=(MESSAGES,))
+    first.start()
+    while stub.calls["groq.stub"] == 0:
+        time.sleep(0.01)
+    gateway.complete(MESSAGES)
+    second_done.set()
+    first.join()
+
+    assert blocked == []
+    assert gateway.usage()["groq"]["requests"] == 2
+
+
+def test_backoff_delay_is_full_jitter_capped():
+    for attempt in range(10):
+        delay = backoff_delay(attempt)
+        assert 0 <= delay <= min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt)
+    assert backoff_delay(0, "5") == 5
+    assert backoff_delay(0, "3600") == LLM_BACKOFF_MAX
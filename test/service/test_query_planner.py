@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+from service.query_planner import (
+    QueryPlan, plan_query, CARD_OVERFETCH, PUSHDOWN, LOCAL, DEFERRED, DROPPED,
+)
+from service.shard_planner import SEARCH_RESULT_CAP
+from utils.constant import CompanyHeadcount
+
+
+def placements(plan: QueryPlan) -> set:
+    return {(predicate.criterion, predicate.placement) for predicate in plan.predicates}
+
+
+def card(title: str):
+    return SimpleNamespace(title=title)
+
+
+def test_mapped_criteria_are_pushed_down():
+    plan = plan_query({
+        "jobTitle": "Head of Sales",
+        "seniorityLevel": ["Director"],
+        "yearsOfExperience": 3,
+        "industry": "Software Development",
+        "functions": ["Sales", "Marketing"],
+        "companyHeadcount": [CompanyHeadcount.MID_SIZED_BUSINESS],
+    })
+
+    assert placements(plan) == {
+        ("jobTitle", PUSHDOWN), ("seniorityLevel", PUSHDOWN), ("yearsOfExperience", PUSHDOWN),
+        ("industry", PUSHDOWN), ("functions", PUSHDOWN), ("companyHeadcount", PUSHDOWN),
+    }
+    assert plan.functions == ["Sales", "Marketing"]
+    assert plan.company_headcount == [CompanyHeadcount.MID_SIZED_BUSINESS]
+    # The title is a search filter already, the card check is opt-in
+    assert not plan.filters_cards
+    assert plan.check_card(card("Account Executive")) is None
+
+
+def test_functions_without_an_id_are_all_checked_on_the_card():
+    plan = plan_query({"functions": ["Sales", "Underwater basket weaving"]})
+
+    assert placements(plan) == {("functions", LOCAL)}
+    assert plan.functions == []
+    assert plan.local_functions == ["Sales", "Underwater basket weaving"]
+    assert plan.filters_cards
+    assert plan.check_card(card("Regional Sales Director")) is None
+    assert plan.check_card(card("Software Engineer")) is not None
+    assert plan.savings()["cardsRejected"] == 1
+
+
+def test_unusable_criteria_are_deferred_or_dropped():
+    plan = plan_query({
+        "seniorityLevel": ["Director", "Galactic overlord"],
+        "yearsOfExperience": "forever and a day",
+        "companyHeadcount": ["huge"],
+        "goodToHave": "SaaS background; speaks Bahasa",
+    })
+
+    assert placements(plan) == {
+        ("seniorityLevel", PUSHDOWN), ("seniorityLevel", DROPPED), ("yearsOfExperience", DROPPED),
+        ("companyHeadcount", DROPPED), ("goodToHave", DEFERRED),
+    }
+    assert [predicate.value for predicate in plan.predicates if predicate.placement == DEFERRED] == ["SaaS background", "speaks Bahasa"]
+
+
+def test_title_min_score_rejects_unrelated_titles():
+    plan = QueryPlan(job_title="Head of Sustainability", seniority_levels=[], years_of_experience=None, industry=None, title_min_score=50)
+
+    assert plan.filters_cards
+    assert plan.check_card(card("Sustainability Lead")) is None
+    assert "scores" in plan.check_card(card("Frontend Developer"))
+    # A card without a title is left for enrichment to decide
+    assert plan.check_card(card("NA")) is None
+    savings = plan.savings()
+    assert (savings["cardsSeen"], savings["cardsRejected"], savings["profileVisitsSaved"]) == (3, 1, 2)
+
+
+def test_search_target_over_fetches_only_when_cards_are_checked():
+    unchecked = plan_query({"jobTitle": "CTO"})
+    checked = plan_query({"functions": ["Underwater basket weaving"]})
+
+    assert unchecked.search_target(100) == 100
+    assert checked.search_target(100) == 100 * CARD_OVERFETCH
+    # Over-fetching stops at the result cap of one query, a larger order keeps its own size
+    assert checked.search_target(SEARCH_RESULT_CAP - 1) == SEARCH_RESULT_CAP
+    assert checked.search_target(SEARCH_RESULT_CAP + 500) == SEARCH_RESULT_CAP + 500
@@ -0,0 +1,33 @@
+from service.result_cache import criteria_hash
+
+
+PAYLOAD = {
+    "jobTitle": "Head of Sales",
+    "numberOfLeads": 50,
+    "seniorityLevel": ["Director", "VP"],
+    "industry": "Software Development",
+    "yearsOfExperience": 3,
+    "goodToHave": "SaaS background",
+    "functions": ["Sales"],
+    "companyHeadcount": None,
+}
+
+
+def test_criteria_hash_ignores_case_spacing_and_order():
+    variant = {
+        **PAYLOAD,
+        "jobTitle": "  head of   SALES ",
+        "seniorityLevel": ["vp", "Director", "VP"],
+        "industry": "software development",
+    }
+    assert criteria_hash(variant) == criteria_hash(PAYLOAD)
+
+
+def test_criteria_hash_ignores_good_to_have():
+    assert criteria_hash({**PAYLOAD, "goodToHave": "Fintech"}) == criteria_hash(PAYLOAD)
+
+
+def test_criteria_hash_changes_with_criteria():
+    assert criteria_hash({**PAYLOAD, "numberOfLeads": 100}) != criteria_hash(PAYLOAD)
+    assert criteria_hash({**PAYLOAD, "seniorityLevel": ["Director"]}) != criteria_hash(PAYLOAD)
+    assert criteria_hash({**PAYLOAD, "companyHeadcount": ["51-200"]}) != criteria_hash(PAYLOAD)
@@ -0,0 +1,95 @@
+import os
+import json
+import threading
+from service.search_query import (
+    SEARCH_URL, FilterIdCache, build_search_url, seniority_filter_ids, years_at_company_id,
+)
+from utils.constant import SeniorityLevel, YearsOfExperience
+
+
+def _query(url: str) -> str:
+    assert url.startswith(f"{SEARCH_URL}?query=(filters:List(")
+    assert url.endswith("))&viewAllFilters=true")
+    return url[len(f"{SEARCH_URL}?query=(filters:List("):-len("))&viewAllFilters=true")]
+
+
+def test_seniority_maps_taxonomy_and_sales_navigator_labels():
+    assert seniority_filter_ids([SeniorityLevel.DIRECTOR, "Vice President"]) == [(220, "Director"), (300, "Vice President")]
+    # CX and CXO are the same Sales Navigator level
+    assert seniority_filter_ids([SeniorityLevel.CX, SeniorityLevel.CXO]) == [(310, "CXO")]
+    assert seniority_filter_ids("In Training") == [(100, "In Training")]
+    assert seniority_filter_ids(None) == []
+
+
+def test_years_at_company_from_number_or_label():
+    assert years_at_company_id(0) == (1, YearsOfExperience.LESS_THAN_ONE_YEAR)
+    assert years_at_company_id(2) == (2, YearsOfExperience.ONE_TO_TWO_YEARS)
+    assert years_at_company_id("3") == (3, YearsOfExperience.THREE_TO_FIVE_YEARS)
+    assert years_at_company_id(12) == (5, YearsOfExperience.MORE_THAN_TEN_YEARS)
+    assert years_at_company_id("6 to 10 years") == (4, YearsOfExperience.SIX_TO_TEN_YEARS)
+    assert years_at_company_id(None) is None
+
+
+def test_build_search_url_encodes_every_filter():
+    url = build_search_url(
+        job_title="Head of Sales, EMEA",
+        seniority_levels=[SeniorityLevel.DIRECTOR],
+        years_of_experience=3,
+        industry=("96", "IT Services and IT Consulting"),
+        functions=["Sales"],
+        company_headcount=["51-200 employees"],
+    )
+    query = _query(url)
+    # Values are percent-encoded so their commas and parentheses can't break the Rest.li syntax
+    assert "(type:CURRENT_TITLE,values:List((text:Head%20of%20Sales%2C%20EMEA,selectionType:INCLUDED)))" in query
+    assert "(type:SENIORITY_LEVEL,values:List((id:220,text:Director,selectionType:INCLUDED)))" in query
+    assert "(type:YEARS_AT_CURRENT_COMPANY,values:List((id:3,text:3%20to%205%20years,selectionType:INCLUDED)))" in query
+    assert "(type:INDUSTRY,values:List((id:96,text:IT%20Services%20and%20IT%20Consulting,selectionType:INCLUDED)))" in query
+    assert "(type:FUNCTION,values:List((id:25,text:Sales,selectionType:INCLUDED)))" in query
+    assert "(type:COMPANY_HEADCOUNT,values:List((id:D,text:51-200%20employees,selectionType:INCLUDED)))" in query
+
+
+def test_build_search_url_skips_unmapped_filters():
+    query = _query(build_search_url(job_title="CTO", seniority_levels=["zzz"], functions=["Underwater basket weaving"]))
+    assert query == "(type:CURRENT_TITLE,values:List((text:CTO,selectionType:INCLUDED)))"
+    assert _query(build_search_url()) == ""
+
+
+def test_filter_ids_learned_from_url_persist(tmp_path):
+    path = str(tmp_path / "filter_ids.json")
+    url = build_search_url(industry=("86", "Renewables & Environment"))
+    learned = FilterIdCache(path).learn_from_url("INDUSTRY", "renewables", url.replace("%", "%25"))
+
+    assert learned == ("86", "Renewables & Environment")
+    # A new cache (another worker) reads it from disk, by label or by the text that was typed
+    cache = FilterIdCache(path)
+    assert cache.get("INDUSTRY", "renewables & environment") == ("86", "Renewables & Environment")
+    assert cache.get("INDUSTRY", "Renewables") == ("86", "renewables")
+    assert cache.get("INDUSTRY", "Fintech") is None
+
+
+def test_concurrent_learns_keep_every_id(tmp_path):
+    path = str(tmp_path / "filter_ids.json")
+    # One cache per "worker", so only the file lock keeps them apart
+    caches = [FilterIdCache(path) for _ in range(8)]
+    start = threading.Barrier(len(caches))
+    errors = []
+
+    def learn(index, cache):
+        start.wait()
+        try:
+            for round in range(10):
+                cache.learn("INDUSTRY", f"industry {index}-{round}", str(index * 100 + round))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=learn, args=(index, cache)) for index, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    learned = json.load(open(path, encoding="utf-8"))["INDUSTRY"]
+    assert len(learned) == 80
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
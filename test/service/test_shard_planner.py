@@ -0,0 +1,62 @@
+import pytest
+from service.shard_planner import Shard, plan_shards, HEADCOUNT_BANDS, SEARCH_RESULT_CAP, SHARD_MIN_LEADS
+from utils.constant import CompanyHeadcount
+
+DIRECTOR, VP, CXO = "Director", "Vice President", "CXO"
+
+
+def banded(levels, bands=HEADCOUNT_BANDS):
+    return [Shard(level, [band]) for level in levels for band in bands]
+
+
+@pytest.mark.parametrize("case, kwargs, expected", [
+    (
+        "small order stays one query",
+        dict(seniority_levels=[DIRECTOR, VP], total=10_000, target=SHARD_MIN_LEADS, browsers=4),
+        [Shard([DIRECTOR, VP])],
+    ),
+    (
+        "few results stay one query whatever the target",
+        dict(seniority_levels=[DIRECTOR, VP], total=SHARD_MIN_LEADS, target=1_000, browsers=4),
+        [Shard([DIRECTOR, VP])],
+    ),
+    (
+        "one browser below the cap stays one query",
+        dict(seniority_levels=[DIRECTOR, VP], total=None, target=SEARCH_RESULT_CAP, browsers=1),
+        [Shard([DIRECTOR, VP])],
+    ),
+    (
+        "one shard per seniority when that keeps the browsers busy",
+        dict(seniority_levels=[DIRECTOR, VP, CXO, VP], total=5_000, target=1_000, browsers=3),
+        [Shard([DIRECTOR]), Shard([VP]), Shard([CXO])],
+    ),
+    (
+        "band split with catch-all when browsers would idle",
+        dict(seniority_levels=[DIRECTOR], total=5_000, target=1_000, browsers=2),
+        banded([[DIRECTOR]]) + [Shard([DIRECTOR], catch_all=True)],
+    ),
+    (
+        "band split with catch-alls when the seniority shards exceed the cap",
+        dict(seniority_levels=[DIRECTOR, VP], total=None, target=2 * SEARCH_RESULT_CAP + 1, browsers=2),
+        banded([[DIRECTOR], [VP]]) + [Shard([DIRECTOR], catch_all=True), Shard([VP], catch_all=True)],
+    ),
+    (
+        "one browser above the cap splits an unfiltered seniority by band",
+        dict(seniority_levels=[], total=None, target=SEARCH_RESULT_CAP + 1, browsers=1),
+        banded([None]) + [Shard(None, catch_all=True)],
+    ),
+    (
+        "a headcount filter limits the bands and needs no catch-all",
+        dict(seniority_levels=[DIRECTOR], total=5_000, target=1_000, browsers=2,
+             company_headcount=[CompanyHeadcount.MID_SIZED_BUSINESS, CompanyHeadcount.MID_LARGE_SIZED_BUSINESS]),
+        banded([[DIRECTOR]], [CompanyHeadcount.MID_SIZED_BUSINESS, CompanyHeadcount.MID_LARGE_SIZED_BUSINESS]),
+    ),
+])
+def test_plan_shards(case, kwargs, expected):
+    assert plan_shards(**kwargs) == expected, case
+
+
+def test_shard_labels():
+    assert str(Shard([DIRECTOR, VP])) == "Director, Vice President"
+    assert str(Shard(None, [CompanyHeadcount.LARGE_BUSINESS])) == "any seniority / 501-1000 employees"
+    assert str(Shard([CXO], catch_all=True)) == "CXO / catch-all"
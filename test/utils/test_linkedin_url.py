@@ -0,0 +1,65 @@
+import pandas as pd
+from utils.linkedin_url import parse, member_id, company_id, strip_tracking, normalize_frame, LinkedInRef, LEAD, COMPANY, PROFILE
+
+
+def test_member_id_ignores_search_token_and_auth_suffix():
+    first = "https://www.linkedin.com/sales/lead/ACwAAAB1cDEF,NAME_SEARCH,xyZ1?_ntb=abc123"
+    second = "https://www.linkedin.com/sales/lead/ACwAAAB1cDEF,OUT_OF_NETWORK,Qr7t?_ntb=def456"
+    assert member_id(first) == "ACwAAAB1cDEF"
+    assert member_id(second) == member_id(first)
+
+
+def test_member_id_of_percent_encoded_link():
+    assert member_id("https%253A%252F%252Fwww.linkedin.com%252Fsales%252Flead%252FACwAAAB1cDEF%252CNAME_SEARCH") == "ACwAAAB1cDEF"
+
+
+def test_company_id_from_sales_and_public_links():
+    assert company_id("https://www.linkedin.com/sales/company/1441?_ntb=abc") == "1441"
+    assert company_id("https://www.linkedin.com/company/1441/") == "1441"
+    assert company_id("https://www.linkedin.com/sales/lead/ACwAAAB1cDEF") is None
+
+
+def test_public_profile_slug_is_lowercased():
+    assert parse("https://www.linkedin.com/in/Jane-Doe/?trk=people") == LinkedInRef(PROFILE, "jane-doe")
+
+
+def test_unparseable_values():
+    for value in (None, "", "NA", "NULL", "https://example.com/about"):
+        assert parse(value) is None
+        assert member_id(value) is None
+
+
+def test_ref_url_is_canonical():
+    assert LinkedInRef(LEAD, "ACwAAAB1cDEF").url == "https://www.linkedin.com/sales/lead/ACwAAAB1cDEF"
+    assert str(LinkedInRef(COMPANY, "1441")) == "company:1441"
+
+
+def test_strip_tracking():
+    assert strip_tracking("https://www.linkedin.com/in/jane-doe?miniProfileUrn=abc#top") == "https://www.linkedin.com/in/jane-doe"
+    assert strip_tracking(None) is None
+
+
+def test_normalize_frame_matches_parse_row_by_row():
+    links = [
+        "https://www.linkedin.com/sales/lead/ACwAAAB1cDEF,NAME_SEARCH,xyZ1?_ntb=abc123",
+        "https%253A%252F%252Fwww.linkedin.com%252Fsales%252Flead%252FACwAAAB1cDEF%252CNAME_SEARCH",
+        "https://www.linkedin.com/in/Jane-Doe/?trk=people",
+        "NA",
+        None,
+    ]
+    companies = [
+        "https://www.linkedin.com/sales/company/1441?_ntb=abc",
+        "https://www.linkedin.com/company/1441/",
+        "NULL",
+        None,
+        "https://example.com/about",
+    ]
+    df = pd.DataFrame({"Profile Link": links, "Company Link": companies})
+
+    result = normalize_frame(df, {"Profile Link": "memberId", "Company Link": "companyId"})
+
+    assert result is df
+    for column, target in (("Profile Link", "memberId"), ("Company Link", "companyId")):
+        expected = [ref.id if ref else None for ref in map(parse, df[column])]
+        actual = [None if pd.isna(value) else value for value in result[target]]
+        assert actual == expected
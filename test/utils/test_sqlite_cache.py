@@ -0,0 +1,106 @@
+import time
+import threading
+import utils.sqlite_cache
+from utils.sqlite_cache import SqliteCache
+
+
+def make_cache(tmp_path, owner=None, **kwargs):
+    cache = SqliteCache(str(tmp_path / "cache.db"), "item", ttl=kwargs.pop("ttl", 3600), **kwargs)
+    if owner:
+        cache._owner = owner  # stands in for another process on the same file
+    return cache
+
+
+class CountingFetch:
+    def __init__(self, value, delay=0.0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self.value
+
+
+def test_concurrent_threads_fetch_once(tmp_path):
+    cache = make_cache(tmp_path)
+    fetch = CountingFetch({"name": "Acme"}, delay=0.2)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_fetch("acme", fetch))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert results == [{"name": "Acme"}] * 8
+    assert cache.get("acme") == {"name": "Acme"}
+
+
+def test_waits_for_the_fetch_of_another_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.sqlite_cache, "POLL_INTERVAL", 0.01)
+    cache = make_cache(tmp_path)
+    other = make_cache(tmp_path, owner="other-process")
+    assert other._claim("acme", lease=30)
+    fetch = CountingFetch({"name": "mine"})
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_fetch("acme", fetch)))
+    waiter.start()
+    time.sleep(0.1)
+    other.set("acme", {"name": "theirs"})
+    waiter.join(5)
+
+    assert results == [{"name": "theirs"}]
+    assert fetch.calls == 0
+
+
+def test_takes_over_a_lapsed_claim(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils.sqlite_cache, "POLL_INTERVAL", 0.01)
+    cache = make_cache(tmp_path)
+    crashed = make_cache(tmp_path, owner="crashed-process")
+    assert crashed._claim("acme", lease=0.1)
+    # A live claim blocks a second one
+    assert not cache._claim("acme", lease=30)
+    fetch = CountingFetch({"name": "Acme"})
+
+    assert cache.get_or_fetch("acme", fetch, lease=5) == {"name": "Acme"}
+    assert fetch.calls == 1
+    # The claim is released once the value is stored
+    assert crashed._claim("acme", lease=30)
+
+
+def test_rejected_result_is_not_stored(tmp_path):
+    cache = make_cache(tmp_path)
+    fetch = CountingFetch({"error": "page did not load"})
+
+    value = cache.get_or_fetch("acme", fetch, should_cache=lambda value: "error" not in value)
+
+    assert value == {"error": "page did not load"}
+    assert cache.get_entry("acme") is None
+    cache.get_or_fetch("acme", fetch, should_cache=lambda value: "error" not in value)
+    assert fetch.calls == 2
+
+
+def test_evict_drops_expired_then_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path, ttl=60, max_entries=3)
+    for index in range(5):
+        cache.set(f"key{index}", index)
+        time.sleep(0.01)
+    cache.get("key0")  # most recently used now
+    cache._connect().execute("UPDATE item SET fetched_at = ? WHERE key = 'key4'", (time.time() - 120,))
+
+    assert cache.evict() == 2
+
+    assert cache.get_entry("key4") is None  # expired
+    assert cache.get_entry("key1") is None  # least recently used beyond max_entries
+    assert [cache.get(f"key{index}") for index in (0, 2, 3)] == [0, 2, 3]
+    assert cache.get("key0", max_age=0) is None
@@ -0,0 +1,189 @@
+import asyncio
+from utils.websocket import ConnectionManager, DROP, DISCONNECT
+
+
+class FakeWebSocket:
+    """Stand-in for a client socket; `send_text` blocks until `release()` while the socket is stalled."""
+
+    def __init__(self, stalled: bool = False, hang: bool = False):
+        self.received = []
+        self.accepted = False
+        self.closed_with = None
+        self.hang = hang
+        self.flowing = asyncio.Event()
+        if not stalled:
+            self.flowing.set()
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, message: str):
+        if self.hang:
+            await asyncio.Event().wait()
+        await self.flowing.wait()
+        self.received.append(message)
+
+    async def close(self, code: int = 1000):
+        self.closed_with = code
+
+    def release(self):
+        self.flowing.set()
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_slow_subscriber_does_not_delay_the_others():
+    async def scenario():
+        manager = ConnectionManager(queue_size=4, slow_policy=DROP)
+        slow, fast = FakeWebSocket(stalled=True), FakeWebSocket()
+        await manager.connect(slow, topics=("session",))
+        await manager.connect(fast, topics=("session",))
+
+        for i in range(10):
+            await asyncio.wait_for(manager.broadcast(f"m{i}", topic="session"), 0.1)
+        await settle()
+
+        assert fast.received == [f"m{i}" for i in range(10)]
+        assert slow.received == []
+        manager.disconnect(slow)
+        manager.disconnect(fast)
+
+    asyncio.run(scenario())
+
+
+def test_drop_policy_keeps_the_newest_messages_in_a_bounded_queue():
+    async def scenario():
+        manager = ConnectionManager(queue_size=3, slow_policy=DROP)
+        slow = FakeWebSocket(stalled=True)
+        connection = await manager.connect(slow, topics=("session",))
+        await manager.broadcast("m0", topic="session")
+        await settle()  # the sender takes m0 and blocks on it
+
+        for i in range(1, 6):
+            await manager.broadcast(f"m{i}", topic="session")
+        assert connection.queue.qsize() == 3
+        assert connection.dropped == 2
+        assert manager.metrics()["maxQueueDepth"] == 3
+
+        slow.release()
+        await settle()
+        assert slow.received == ["m0", "m3", "m4", "m5"]
+        assert slow.closed_with is None
+        assert manager.subscriber_count("session") == 1
+        manager.disconnect(slow)
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_policy_closes_only_the_slow_consumer():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, slow_policy=DISCONNECT)
+        slow, fast = FakeWebSocket(stalled=True), FakeWebSocket()
+        await manager.connect(slow, topics=("session",))
+        await manager.connect(fast, topics=("session",))
+        await settle()
+
+        for i in range(5):
+            await manager.broadcast(f"m{i}", topic="session")
+            await settle()
+
+        assert slow.closed_with == 1013
+        assert slow not in manager.active_connections
+        assert manager.subscriber_count("session") == 1
+        assert manager.slow_disconnects == 1
+        assert manager.dropped == 0
+        assert fast.received == [f"m{i}" for i in range(5)]
+        manager.subscribe(slow, "session")  # late subscribe of a dropped socket is a no-op
+        assert manager.subscriber_count("session") == 1
+        manager.disconnect(fast)
+
+    asyncio.run(scenario())
+
+
+def test_send_timeout_disconnects_a_hung_socket():
+    async def scenario():
+        manager = ConnectionManager(queue_size=8, send_timeout=0.05)
+        hung = FakeWebSocket(hang=True)
+        await manager.connect(hung, topics=("session",))
+        await manager.broadcast("m0", topic="session")
+        await asyncio.sleep(0.2)
+
+        assert hung.closed_with == 1013
+        assert hung not in manager.active_connections
+        assert manager.subscriber_count("session") == 0
+        assert manager.slow_disconnects == 1
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_unsubscribes_every_topic_and_stops_the_sender():
+    async def scenario():
+        manager = ConnectionManager()
+        socket, other = FakeWebSocket(), FakeWebSocket()
+        connection = await manager.connect(socket, topics=("a", "b"))
+        await manager.connect(other, topics=("b",))
+        assert socket.accepted
+        assert manager.subscriber_count("a") == 1 and manager.subscriber_count("b") == 2
+
+        manager.disconnect(socket)
+        await settle()
+        assert "a" not in manager.topics
+        assert manager.subscriber_count("b") == 1
+        assert connection.sender.done()
+
+        manager.unsubscribe(other, "b")
+        assert manager.topics == {}
+        manager.disconnect(socket)  # disconnecting twice is harmless
+        manager.disconnect(other)
+
+    asyncio.run(scenario())
+
+
+def test_disconnect_during_a_send_still_stops_the_sender():
+    async def scenario():
+        manager = ConnectionManager()
+        socket = FakeWebSocket()
+        connection = await manager.connect(socket, topics=("session",))
+        await manager.broadcast("m0", topic="session")
+        await asyncio.sleep(0)  # the sender is inside wait_for when the cancel lands
+        manager.disconnect(socket)
+        await settle()
+        assert connection.sender.done()
+
+    asyncio.run(scenario())
+
+
+def test_metrics_count_publishes_sends_and_queue_depth():
+    async def scenario():
+        manager = ConnectionManager(queue_size=4, slow_policy=DROP)
+        slow, fast = FakeWebSocket(stalled=True), FakeWebSocket()
+        await manager.connect(slow, topics=("a",))
+        await manager.connect(fast, topics=("a", "b"))
+        await settle()
+
+        for i in range(3):
+            await manager.broadcast(f"a{i}", topic="a")
+            await settle()
+        await manager.broadcast("everyone")
+        await manager.send_personal_message("direct", fast)
+        await settle()
+
+        metrics = manager.metrics()
+        assert metrics == {
+            "connections": 2,
+            "topics": 2,
+            "published": 4,
+            "sent": 5,
+            "dropped": 0,
+            "slowDisconnects": 0,
+            "queuedMessages": 3,  # a0 is held by the blocked sender
+            "maxQueueDepth": 3,
+            "slowPolicy": DROP,
+        }
+        manager.disconnect(slow)
+        manager.disconnect(fast)
+
+    asyncio.run(scenario())
@@ -9,6 +9,12 @@ class ConstantsTask:
     FETCH_LEAD_DATA = "fetch-profile-data"
     ANALYZE_LEAD_DATA = "analyze-profile-data"
 
+class ConstantsJob:
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
 class SeniorityLevel:
     ENTRY = "Entry Level"
     SENIOR = "Experienced professionals"
@@ -0,0 +1,91 @@
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+from urllib.parse import unquote
+import pandas as pd
+
+# Sales Navigator and public links carry per-search state (`_ntb` tokens,
+# NAME_SEARCH / OUT_OF_NETWORK auth suffixes, tracking params) that changes
+# on every run. Everything downstream (caches, dedupe, joins) keys on the
+# stable ids extracted here instead of on the raw URLs.
+
+LEAD = "lead"          # Sales Navigator member id, /sales/lead/<memberId>,<authType>,<token>
+COMPANY = "company"    # numeric company id, /sales/company/<id> or /company/<id>
+PROFILE = "profile"    # public profile slug, /in/<slug>
+
+LEAD_PATTERN = r"/sales/(?:lead|people)/(?P<id>[A-Za-z0-9_-]+)"
+COMPANY_PATTERN = r"/(?:sales/)?company/(?P<id>\d+)"
+PROFILE_PATTERN = r"/in/(?P<id>[^/?#,]+)"
+
+_PATTERNS = [
+    (LEAD, re.compile(LEAD_PATTERN)),
+    (COMPANY, re.compile(COMPANY_PATTERN)),
+    (PROFILE, re.compile(PROFILE_PATTERN)),
+]
+
+
+class LinkedInRef(NamedTuple):
+    kind: str
+    id: str
+
+    @property
+    def url(self) -> str:
+        if self.kind == LEAD:
+            return f"https://www.linkedin.com/sales/lead/{self.id}"
+        if self.kind == COMPANY:
+            return f"https://www.linkedin.com/sales/company/{self.id}"
+        return f"https://www.linkedin.com/in/{self.id}"
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.id}"
+
+
+@lru_cache(maxsize=65536)
+def parse(url: str) -> Optional[LinkedInRef]:
+    """Typed id of a lead, company or public-profile URL, or None if it is none of those."""
+    if not isinstance(url, str) or not url or url in ("NA", "NULL"):
+        return None
+    # Links copied out of the page are sometimes percent-encoded once or twice
+    path = unquote(unquote(url)).split("?", 1)[0].split("#", 1)[0]
+    for kind, pattern in _PATTERNS:
+        match = pattern.search(path)
+        if match:
+            value = match.group("id")
+            # Public slugs are case-insensitive; member ids are not
+            return LinkedInRef(kind, value.lower().rstrip("/") if kind == PROFILE else value)
+    return None
+
+
+def member_id(url: str) -> Optional[str]:
+    ref = parse(url)
+    return ref.id if ref and ref.kind == LEAD else None
+
+
+def company_id(url: str) -> Optional[str]:
+    ref = parse(url)
+    return ref.id if ref and ref.kind == COMPANY else None
+
+
+def strip_tracking(url: str) -> str:
+    """The URL without its query string (`_ntb` and other per-search params)."""
+    if not isinstance(url, str):
+        return url
+    return url.split("?", 1)[0].split("#", 1)[0]
+
+
+def normalize_frame(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """
+    Adds id columns to `df` in one vectorised pass per column, e.g.
+    normalize_frame(df, {"Profile Link": "memberId", "Company Link": "companyId"}).
+    The kind of id is inferred from what the column contains.
+    """
+    for source, target in columns.items():
+        urls = df[source].astype("string").map(lambda value: unquote(unquote(value)) if isinstance(value, str) and "%" in value else value)
+        ids = None
+        for pattern in (LEAD_PATTERN, COMPANY_PATTERN, PROFILE_PATTERN):
+            extracted = urls.str.extract(pattern, expand=False)
+            if pattern == PROFILE_PATTERN:
+                extracted = extracted.str.lower()
+            ids = extracted if ids is None else ids.fillna(extracted)
+        df[target] = ids
+    return df
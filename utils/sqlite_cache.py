@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+INFLIGHT_LEASE = 120  # seconds another process waits on a fetch before taking it over
+POLL_INTERVAL = 0.5
+
+
+class SqliteCache:
+    """
+    Persistent JSON key/value cache in a local SQLite file, shared by every
+    process on the host (the API and the scrape workers).
+
+    - entries expire after `ttl` seconds and the least recently used ones are
+      evicted beyond `max_entries`
+    - `get_or_fetch` is single-flight: concurrent callers for the same key,
+      in this process or another one, wait for one fetch instead of repeating it
+    """
+
+    def __init__(self, path: str, table: str, ttl: int, max_entries: int = 50000):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> threading.Event of the fetch running in this process
+        self._owner = f"{os.getpid()}"
+        with self._connect() as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_accessed_at ON {table} (accessed_at)")
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table}_inflight (key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_entry(self, key: str) -> Optional[tuple]:
+        """(value, fetched_at) for `key`, expired or not, or None."""
+        row = self._connect().execute(f"SELECT value, fetched_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def get(self, key: str, max_age: int = None) -> Optional[Any]:
+        """The cached value if it is younger than `max_age` (default: the cache TTL)."""
+        entry = self.get_entry(key)
+        if entry is None:
+            return None
+        value, fetched_at = entry
+        if time.time() - fetched_at > (self.ttl if max_age is None else max_age):
+            return None
+        self._connect().execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return value
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        self._connect().execute(
+            f"INSERT INTO {self.table} (key, value, fetched_at, accessed_at) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT(key) DO UPDATE SET value = excluded.value, fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at",
+            (key, json.dumps(value, ensure_ascii=False), now, now),
+        )
+
+    def delete(self, key: str):
+        self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def evict(self) -> int:
+        """Drops expired entries, then the least recently used ones above `max_entries`."""
+        conn = self._connect()
+        removed = conn.execute(f"DELETE FROM {self.table} WHERE fetched_at < ?", (time.time() - self.ttl,)).rowcount
+        removed += conn.execute(
+            f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        ).rowcount
+        conn.execute(f"DELETE FROM {self.table}_inflight WHERE expires_at < ?", (time.time(),))
+        return removed
+
+    def _claim(self, key: str, lease: int) -> bool:
+        """Marks `key` as being fetched by this process unless another live process already is."""
+        now = time.time()
+        cursor = self._connect().execute(
+            f"INSERT INTO {self.table}_inflight (key, owner, expires_at) VALUES (?, ?, ?) "
+            f"ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            f"WHERE {self.table}_inflight.expires_at < ?",
+            (key, self._owner, now + lease, now),
+        )
+        return cursor.rowcount == 1
+
+    def _unclaim(self, key: str):
+        self._connect().execute(f"DELETE FROM {self.table}_inflight WHERE key = ? AND owner = ?", (key, self._owner))
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any], should_cache: Callable[[Any], bool] = None, lease: int = INFLIGHT_LEASE) -> Any:
+        """
+        Cached value for `key`, or the result of `fetch()` which is then cached
+        (unless `should_cache` rejects it, e.g. for a failed scrape).
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            with self._lock:
+                event = self._inflight.get(key)
+                leader = event is None
+                if leader:
+                    event = self._inflight[key] = threading.Event()
+            if not leader:
+                # Another thread of this process is fetching; its result lands in the table
+                event.wait(lease)
+                continue
+
+            try:
+                if not self._claim(key, lease):
+                    # Another process is fetching; wait for its result or for its claim to lapse
+                    deadline = time.time() + lease
+                    while time.time() < deadline:
+                        time.sleep(POLL_INTERVAL)
+                        value = self.get(key)
+                        if value is not None:
+                            return value
+                        if self._claim(key, lease):
+                            break
+                    else:
+                        logging.warning(f"{self.table} cache: gave up waiting for another process to fetch {key}")
+                        return fetch()
+                try:
+                    value = fetch()
+                    if should_cache is None or should_cache(value):
+                        self.set(key, value)
+                    return value
+                finally:
+                    self._unclaim(key)
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+                event.set()
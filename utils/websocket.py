@@ -1,20 +1,155 @@
+import asyncio
+import logging
+from collections import defaultdict
 from fastapi import WebSocket
 
+DROP = "drop"              # slow consumer loses its oldest queued message
+DISCONNECT = "disconnect"  # slow consumer is closed and has to reconnect (and resume)
+
+
+class Connection:
+    """One client socket with its own bounded outbound queue, drained by a dedicated sender task."""
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.topics = set()
+        self.sender = None
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    """
+    WebSocket pub/sub. Clients subscribe to topics (e.g. a session id) and a
+    publish only enqueues the message for each subscriber, so it never waits
+    on a socket. Every connection has a sender task that writes its queue to
+    the socket; a client that can't keep up fills only its own queue, and is
+    then handled by `slow_policy` without slowing the other subscribers.
+    """
+
+    def __init__(self, queue_size: int = 256, slow_policy: str = DROP, send_timeout: float = 10):
+        self.queue_size = queue_size
+        self.slow_policy = slow_policy
+        self.send_timeout = send_timeout
+        self.active_connections: dict[WebSocket, Connection] = {}
+        self.topics: dict[str, set[Connection]] = defaultdict(set)
+        self.published = 0
+        self.sent = 0
+        self.dropped = 0
+        self.slow_disconnects = 0
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, topics: tuple = ()) -> Connection:
         await websocket.accept()
-        self.active_connections.append(websocket)
+        connection = Connection(websocket, self.queue_size)
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        self.active_connections[websocket] = connection
+        for topic in topics:
+            self.subscribe(websocket, topic)
+        return connection
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return  # already dropped, e.g. by the slow-consumer policy
+        connection.topics.add(topic)
+        self.topics[topic].add(connection)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return
+        connection.topics.discard(topic)
+        subscribers = self.topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(connection)
+            if not subscribers:
+                del self.topics[topic]
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self.topics.get(topic, ()))
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        connection = self.active_connections.pop(websocket, None)
+        if connection is None:
+            return
+        connection.closed = True
+        for topic in list(connection.topics):
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.topics[topic]
+        if connection.sender is not None and connection.sender is not asyncio.current_task():
+            connection.sender.cancel()
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        connection = self.active_connections.get(websocket)
+        if connection is not None:
+            self._enqueue(connection, message)
+
+    async def broadcast(self, message: str, topic: str = None):
+        """Queue `message` for every subscriber of `topic`, or for every connection."""
+        connections = self.topics.get(topic, ()) if topic is not None else self.active_connections.values()
+        self.published += 1
+        for connection in list(connections):
+            self._enqueue(connection, message)
+
+    def _enqueue(self, connection: Connection, message: str):
+        try:
+            connection.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.slow_policy == DISCONNECT:
+            self.slow_disconnects += 1
+            logging.warning("Disconnecting slow WebSocket consumer (outbound queue full)")
+            self.disconnect(connection.websocket)
+            asyncio.create_task(self._close(connection.websocket))
+            return
+        connection.queue.get_nowait()
+        connection.queue.put_nowait(message)
+        connection.dropped += 1
+        self.dropped += 1
+
+    async def _send_loop(self, connection: Connection):
+        try:
+            # `closed` backs up the cancel in disconnect(): wait_for can swallow a cancellation
+            # that lands just as the send completes, leaving the loop on queue.get()
+            while not connection.closed:
+                message = await connection.queue.get()
+                await asyncio.wait_for(connection.websocket.send_text(message), self.send_timeout)
+                connection.sent += 1
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            self.slow_disconnects += 1
+            logging.warning(f"WebSocket send timed out after {self.send_timeout}s, disconnecting")
+            self.disconnect(connection.websocket)
+            await self._close(connection.websocket)
+        except Exception as e:
+            logging.info(f"WebSocket sender stopped: {e}")
+            self.disconnect(connection.websocket)
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        try:
+            await websocket.close(code=1013)  # try again later
+        except Exception:
+            pass
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
\ No newline at end of file
+    def metrics(self) -> dict:
+        queued = [connection.queue.qsize() for connection in self.active_connections.values()]
+        return {
+            "connections": len(self.active_connections),
+            "topics": len(self.topics),
+            "published": self.published,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "slowDisconnects": self.slow_disconnects,
+            "queuedMessages": sum(queued),
+            "maxQueueDepth": max(queued, default=0),
+            "slowPolicy": self.slow_policy,
+        }
@@ -0,0 +1,126 @@
+"""
+Scrape worker entry point.
+
+    python worker.py --workers 4 --slots 1 --browsers-per-job 2 --shard-browsers 3
+
+Starts N worker processes. Each process owns its own browser pool and claims
+jobs from the scrape_job queue with a lease that is renewed while the job runs;
+a job whose worker dies is picked up again once its lease expires. With more
+than one browser per job, contact and company enrichment run on their own
+browsers while the search is still harvesting (see service/pipeline.py), and
+with more than one shard browser a large search is split into disjoint
+sub-queries harvested in parallel (see service/shard_planner.py).
+"""
+import os
+import socket
+import asyncio
+import argparse
+import logging
+import multiprocessing
+import traceback
+from dotenv import load_dotenv
+from service.browser_pool import BrowserPool, POOL_BASE_DEBUG_PORT
+from service.login_linkedin import authenticate_driver
+from service.session_vault import session_vault
+from service.job_queue import claim_job, extend_lease, complete_job, fail_job, fail_abandoned_jobs
+from service.leads_service import run_search_leads_job
+from service.job_journal import JobJournal
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+POLL_INTERVAL = 5
+PORTS_PER_WORKER = 20
+
+
+async def heartbeat(job_id: str, worker_id: str, lease_seconds: int):
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        if not await asyncio.to_thread(extend_lease, job_id, worker_id, lease_seconds):
+            logging.warning(f"Worker {worker_id} lost the lease on job {job_id}")
+            return
+
+
+async def run_slot(slot_id: str, pool, lease_seconds: int, browsers_per_job: int, shard_browsers: int = 1):
+    while True:
+        await asyncio.to_thread(fail_abandoned_jobs)
+        job = await asyncio.to_thread(claim_job, slot_id, lease_seconds)
+        if job is None:
+            await asyncio.sleep(POLL_INTERVAL)
+            continue
+
+        beat = asyncio.create_task(heartbeat(job.id, slot_id, lease_seconds))
+        browsers = []
+        try:
+            for _ in range(browsers_per_job + shard_browsers - 1):
+                browsers.append(await asyncio.to_thread(pool.lease))
+            browser = browsers[0]
+            enrich_browsers = browsers[1:browsers_per_job]
+            shard_extra = browsers[browsers_per_job:]
+            await browser.async_driver.submit(
+                run_search_leads_job,
+                session_id=job.session_id,
+                payload=job.payload,
+                driver=browser.driver,
+                resume=job.attempts > 1,
+                enrich_drivers=tuple(extra.driver for extra in enrich_browsers),
+                shard_drivers=tuple(extra.driver for extra in shard_extra),
+            )
+            await asyncio.to_thread(complete_job, job.id, slot_id)
+            # Checkpoints only matter to a retry, the results are in the database now
+            JobJournal.discard_job(job.session_id)
+            logging.info(f"Worker {slot_id} completed job {job.id}")
+        except Exception as e:
+            logging.error(f"Worker {slot_id} failed job {job.id}: {e}")
+            await asyncio.to_thread(fail_job, job.id, slot_id, traceback.format_exc())
+        finally:
+            beat.cancel()
+            for browser in browsers:
+                await asyncio.to_thread(pool.release, browser)
+
+
+async def worker_main(index: int, slots: int, lease_seconds: int, browsers_per_job: int = 1, shard_browsers: int = 1):
+    browsers_per_slot = browsers_per_job + shard_browsers - 1
+    pool = BrowserPool(
+        min_size=slots * browsers_per_slot,
+        max_size=slots * browsers_per_slot,
+        base_debug_port=POOL_BASE_DEBUG_PORT + (index + 1) * PORTS_PER_WORKER,
+        authenticate=authenticate_driver,
+    )
+    pool.start()
+    session_vault.start_refresher(pool)
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        await asyncio.gather(*(run_slot(f"{worker_id}/{slot}", pool, lease_seconds, browsers_per_job, shard_browsers) for slot in range(slots)))
+    finally:
+        pool.close()
+
+
+def run_worker(index: int, slots: int, lease_seconds: int, browsers_per_job: int, shard_browsers: int):
+    logging.info(f"Starting scrape worker {index} (pid {os.getpid()}) with {slots} job slot(s), {browsers_per_job + shard_browsers - 1} browser(s) each")
+    asyncio.run(worker_main(index, slots, lease_seconds, browsers_per_job, shard_browsers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scrape job workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SCRAPE_WORKERS", "1")), help="number of worker processes")
+    parser.add_argument("--slots", type=int, default=1, help="concurrent jobs (browsers) per worker process")
+    parser.add_argument("--browsers-per-job", type=int, default=int(os.getenv("BROWSERS_PER_JOB", "1")), choices=[1, 2, 3], help="1: stages run in turn, 2: enrichment alongside the search, 3: contact and company on their own browsers too")
+    parser.add_argument("--shard-browsers", type=int, default=int(os.getenv("SHARD_BROWSERS", "1")), help="browsers harvesting shards of a large search in parallel (the search browser included)")
+    parser.add_argument("--lease-seconds", type=int, default=120, help="job lease timeout")
+    args = parser.parse_args()
+
+    # spawn, so each worker gets fresh database connections and its own browsers
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=run_worker, args=(index, args.slots, args.lease_seconds, args.browsers_per_job, max(1, args.shard_browsers)), name=f"scrape-worker-{index}")
+        for index in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()